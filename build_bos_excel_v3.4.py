@@ -7,17 +7,281 @@ Creates comprehensive workbook with:
 - 1 dynamic dashboard
 """
 
+import argparse
+import asyncio
+import contextlib
+import datetime
+import hashlib
+import html
+import io
+import json
+import numbers
+import os
+import queue
+import re
+import sqlite3
+import string
+import sys
+import time
+import zipfile
+from collections import OrderedDict
+from xml.etree import ElementTree
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import unquote
+from urllib.request import pathname2url
+
 import pandas as pd
 import openpyxl
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+from openpyxl.chart import LineChart, Reference
+from openpyxl.packaging.custom import StringProperty
+from openpyxl.styles import Font, PatternFill, Border, Side, Alignment, NamedStyle
+from openpyxl.utils import column_index_from_string, get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.utils.datetime import to_excel
 from openpyxl.worksheet.datavalidation import DataValidation
+from openpyxl.writer.excel import ExcelWriter
 import numpy as np
 
-def create_bos_workbook():
-    """Create the complete BOS Excel workbook"""
+BUILDER_VERSION = "3.4"
+DEFAULT_OUTPUT_PATH = "/mnt/user-data/outputs/BOS_Dashboard_Prototype_v3.4.xlsx"
+WATCH_POLL_INTERVAL = 0.2  # seconds between source file checks in watch mode
+DEFAULT_WATCH_DEBOUNCE = 0.3  # seconds the sources must stay unchanged before a rebuild
+DEFAULT_SERVE_HOST = "127.0.0.1"
+DEFAULT_SERVE_PORT = 8765
+DEFAULT_SERVE_CACHE_SIZE = 256  # generated JSON documents and workbooks kept in memory
+JSON_CONTENT_TYPE = "application/json; charset=utf-8"
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DEFAULT_METRICS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bos-grafana", "sli_metrics.csv")
+DEFAULT_INCIDENTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bos-grafana", "incidents.csv")
+DATA_HEADER_STYLE = "BOS Data Header"  # named styles shared by every cell of the data sheets
+DATA_CELL_STYLE = "BOS Data Cell"
+
+# Static HTML site: service pages plus L4 product line and L3 product index pages sharing one stylesheet
+SITE_ASSET_DIR = "assets"
+SITE_STYLESHEET_NAME = "bos.css"
+SITE_MANIFEST = "site_manifest.json"  # page path -> digest of the inputs it was rendered from
+SITE_PAGE_CHUNK = 250  # pages rendered per worker task
+SITE_STATUS_LABELS = ["OK", "WARNING", "CRITICAL", "Unknown"]
+SPARKLINE_WIDTH = 160
+SPARKLINE_HEIGHT = 36
+SITE_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<link rel="stylesheet" href="{root}assets/bos.css">
+</head>
+<body>
+<header class="title">Business Observability Service Dashboard</header>
+<nav class="crumbs">{crumbs_html}</nav>
+<main>
+<h1>{title}</h1>
+{body_html}
+</main>
+<footer>BOS Excel Dashboard Prototype v{version}</footer>
+</body>
+</html>
+"""
+SITE_SERVICE_TEMPLATE = """<section class="context">
+<h2>SERVICE CONTEXT</h2>
+<dl>
+<dt>Service Name:</dt><dd>{serviceName}</dd>
+<dt>Tier Level:</dt><dd>{tierLevel}</dd>
+<dt>Business Purpose:</dt><dd>{businessPurpose}</dd>
+<dt>Performance Question:</dt><dd>{performanceQuestion}</dd>
+</dl>
+</section>
+<section class="sli">
+<h2>SERVICE LEVEL INDICATORS</h2>
+<p class="sli-name"><span>SLI NAME:</span> {sliName}</p>
+<div class="stats">
+<div><span>CURRENT</span><strong>{current}</strong></div>
+<div><span>TARGET</span><strong>{target}</strong></div>
+<div><span>STATUS</span><strong>{status}</strong></div>
+<div><span>TREND</span><strong>{trend}</strong>{sparkline_html}</div>
+</div>
+<dl>
+<dt>Good Events:</dt><dd>{goodEvents}</dd>
+<dt>Total Events:</dt><dd>{totalEvents}</dd>
+<dt>Technical Query:</dt><dd><code>{technicalQuery}</code></dd>
+</dl>
+</section>
+<section class="impact">
+<h2>BUSINESS IMPACT &amp; OWNERSHIP</h2>
+<h3>WHEN THIS FAILS:</h3>
+<dl>
+<dt>Scenario:</dt><dd>{scenario}</dd>
+<dt>Impact:</dt><dd>{impact}</dd>
+<dt>Affected:</dt><dd>{affectedCount} {affectedType}</dd>
+<dt>Financial:</dt><dd>{financial}</dd>
+</dl>
+<div class="columns">
+<div>
+<h3>OWNERSHIP:</h3>
+<dl>
+<dt>Product Owner:</dt><dd>{productOwner}</dd>
+<dt>Technical Owner:</dt><dd>{technicalOwner}</dd>
+<dt>Status:</dt><dd>{operationalStatus}</dd>
+</dl>
+</div>
+<div>
+<h3>SERVICE CONTEXT:</h3>
+<dl>
+<dt>Type:</dt><dd>{serviceType}</dd>
+<dt>Business Unit:</dt><dd>{businessUnit}</dd>
+<dt>Service ID:</dt><dd>{service_id}</dd>
+</dl>
+</div>
+</div>
+</section>"""
+SITE_INDEX_TEMPLATE = """<section class="listing">
+<h2>{heading}</h2>
+<table>
+<thead><tr>{header_html}</tr></thead>
+<tbody>
+{rows_html}
+</tbody>
+</table>
+</section>"""
+SITE_SPARKLINE_TEMPLATE = (
+    '<svg class="sparkline" viewBox="-2 -2 164 40" role="img" aria-label="Trend from {low} to {high}">'
+    '<polyline points="{points}"/></svg>'
+)
+SITE_STYLESHEET = """/* BOS dashboard site: same palette as the workbook */
+body { margin: 0; font: 14px/1.5 Calibri, "Segoe UI", Arial, sans-serif; color: #222; background: #F7F9FC; }
+header.title { padding: 14px 24px; font-size: 18pt; font-weight: bold; color: #FFF; background: linear-gradient(90deg, #1F3864, #2F5597); }
+nav.crumbs { padding: 8px 24px; background: #E7ECF5; }
+nav.crumbs a { color: #2F5597; }
+main { max-width: 1100px; margin: 0 auto; padding: 8px 24px 24px; }
+h1 { font-size: 16pt; color: #1F3864; }
+section { margin: 0 0 20px; background: #FFF; border: 1px solid #D9D9D9; }
+h2 { margin: 0; padding: 4px 12px; font-size: 12pt; color: #FFF; }
+h3 { margin: 12px 12px 4px; font-size: 10pt; }
+.context h2 { background: #70AD47; }
+.sli h2, .listing h2 { background: #5B9BD5; }
+.impact h2 { background: #C5504B; }
+dl { display: grid; grid-template-columns: 180px 1fr; gap: 4px 12px; margin: 12px; }
+dt { font-weight: bold; }
+dd { margin: 0; }
+.context dt { background: #E8F5E8; padding: 0 6px; }
+.sli dt { background: #E1F4FD; padding: 0 6px; }
+.impact dt { background: #FDE9E7; padding: 0 6px; }
+.sli-name { margin: 12px; font-size: 12pt; }
+.sli-name span { font-weight: bold; }
+.stats { display: grid; grid-template-columns: repeat(4, 1fr); gap: 12px; margin: 12px; }
+.stats div { padding: 8px; text-align: center; border: 2px solid #2F5597; }
+.stats span { display: block; font-size: 9pt; font-weight: bold; color: #FFF; background: #2F5597; }
+.stats strong { display: block; margin-top: 6px; font-size: 14pt; }
+.sparkline { width: 100%; height: 40px; }
+.sparkline polyline { fill: none; stroke: #2F5597; stroke-width: 2; }
+.columns { display: grid; grid-template-columns: 1fr 1fr; }
+code { white-space: pre-wrap; }
+table { width: 100%; border-collapse: collapse; }
+th { text-align: left; background: #E1F4FD; }
+th, td { padding: 4px 12px; border-bottom: 1px solid #E7E7E7; }
+footer { padding: 12px 24px; font-size: 9pt; color: #777; }
+"""
+
+# The 5 normalized catalog tables and the key identifying a record in each
+CATALOG_TABLES = ["Services", "SLI_Definitions", "SLO_Configurations", "Impact_Assessments", "Operational_Metadata"]
+CATALOG_KEYS = {
+    "Services": ["service_id"],
+    "SLI_Definitions": ["service_id"],
+    "SLO_Configurations": ["service_id"],
+    "Impact_Assessments": ["service_id", "impactCategory"],
+    "Operational_Metadata": ["service_id"],
+}
+CATALOG_DISPLAY_COLUMNS = {"Services": ["displayName"]}  # service dropdowns and lookups match on these
+# Typed catalog columns; everything else is kept as text when loading CSVs or workbooks
+NUMERIC_COLUMNS = ["tierLevel", "thresholdValue", "sloTarget", "timeSliceTarget", "alertingThreshold", "pageThreshold"]
+BOOLEAN_COLUMNS = ["alertingConfigured"]
+# SQLite catalog backend: same tables and columns, indexed for filtered reads
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+CATALOG_INDEX_COLUMNS = ["service_id", "businessUnit", "l4_product_line"]
+INPUT_DIGEST_PROPERTY = "BOS Input Digest"  # custom document property: digest of --metrics, --events and --incidents
+CHANGE_LOG_COLUMNS = ["table", "service_id", "record_key", "change_type", "field", "old_value", "new_value"]
+
+# Trend charts: every service's history is downsampled to TREND_POINTS values on one hidden sheet
+TREND_POINTS = 24
+TREND_STABLE_BAND = 0.5  # percentage points between first and last third still reported as stable
+TREND_FIRST_ROW = 4  # first service row on Trend_Data (row 2 holds the Dashboard selection)
+DEFAULT_COMPRESSION_LEVEL = 6  # zlib default: 1 = fastest save, 9 = smallest file, 0 = stored
+
+# Alert backtesting: metric history replayed against current and candidate thresholds
+DEFAULT_BACKTEST_THRESHOLDS = "95:99.9:0.1"  # start:stop:step, or a comma-separated list
+DEFAULT_BACKTEST_WINDOWS = "5m,15m,30m,1h"
+BACKTEST_FLAP_POINTS = 3  # alerts clearing within this many evaluations count as flapping
+BACKTEST_NEVER = 1000.0  # stands in for "no alert" above any success rate threshold
+BACKTEST_COLUMNS = ["service_id", "configuration", "threshold", "window", "alerts", "flapping_alerts",
+                    "time_in_alert_pct", "false_alert_time_pct", "degradations", "detected", "mean_time_to_detect_min"]
+
+# SLO recommendations: percentiles of rolling-window achieved reliability from the metric history
+DEFAULT_RECOMMEND_WINDOWS = "7d,28d"
+RECOMMEND_PERCENTILE = 10  # recommend a target met in 90% of rolling windows
+RECOMMEND_PERCENTILES = [1, RECOMMEND_PERCENTILE, 50]
+SLO_TARGET_LADDER = [80.0, 85.0, 90.0, 92.0, 95.0, 97.0, 98.0, 99.0, 99.5, 99.9, 99.95, 99.99]
+ALERT_BUDGET_FRACTION = 0.4  # alerting threshold sits 40% of the error budget below target (99.5 -> 99.3)
+PAGE_BUDGET_FRACTION = 1.0  # page threshold sits a full error budget below target (99.5 -> 99.0)
+
+# Impact cost model: parsed stakeholder rates and dollar amounts joined with failures and incidents
+STAKEHOLDER_PERIOD_DAYS = {"hourly": 1 / 24, "daily": 1, "day": 1, "weekly": 7, "week": 7,
+                           "monthly": 30, "month": 30, "yearly": 365, "annually": 365, "year": 365}
+DOLLAR_MULTIPLIERS = {"": 1, "k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+SEVERITY_IMPACT_SHARE = {"Sev1": 1.0, "Sev2": 0.5, "Sev3": 0.25, "Sev4": 0.1}  # share of stakeholders hit during an incident
+IMPACT_PERIOD = "D"
+IMPACT_COST_COLUMNS = ["level", "service_id", "businessUnit", "period", "failed_events", "total_events",
+                       "incidents", "incident_hours", "daily_stakeholders", "customers_affected_sli",
+                       "customers_affected_incidents", "dollars_per_unit", "dollar_unit", "dollars_at_risk"]
+
+# SLI evaluation against a local event store: one SQLite file per dataSourceDetails database
+EVENT_TIME_COLUMN = "event_time"
+DEFAULT_SLI_WORKERS = 4
+SLI_QUERY_CHUNK = 500  # SLIs per aggregation query; SQLite caps a result row at 2000 columns
+TIME_WINDOW_UNITS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+SQL_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+SQLITE_MAX_ATTACHED = 10  # SQLite's default limit on databases attached to one connection
+SLI_RECORD_COLUMNS = ["service_id", "sliName", "good_events", "total_events", "source",
+                      "p50", "p95", "p99", "thresholdOperator", "thresholdValue", "tail_meets_threshold",
+                      "slices", "compliant_slices"]
+SLI_RESULT_COLUMNS = SLI_RECORD_COLUMNS[:4] + ["current", "status"] + SLI_RECORD_COLUMNS[4:]
+
+# Threshold SLIs: streamed samples kept in mergeable quantile sketches per time slice
+THRESHOLD_OPERATORS = {"lt": np.less, "lte": np.less_equal, "gt": np.greater, "gte": np.greater_equal}
+SKETCH_RELATIVE_ACCURACY = 0.01  # quantiles within 1% of the true sample value
+SKETCH_MAX_BINS = 2048  # beyond this the lowest bins are collapsed, upper quantiles keep their accuracy
+DEFAULT_TIME_SLICE_WINDOW = "5m"
+STREAM_CHUNK_ROWS = 50000
+
+# Shared strings part written by save_workbook (openpyxl only writes inline strings)
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+SHARED_STRINGS_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"
+SHARED_STRINGS_REL_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+WORKSHEET_PART = re.compile(r"xl/worksheets/sheet\d+\.xml$")
+INLINE_STRING_CELL = re.compile(
+    r'<c ([^>]*?)t="inlineStr"([^>]*)><is><t(?: xml:space="preserve")?>([^<]*)</t></is></c>'
+)
+
+# Cached formula values: the builder's lookup formulas are evaluated in Python for the default selection.
+# openpyxl writes an empty <v /> after each formula with ElementTree and <v></v> with lxml
+FORMULA_CELL = re.compile(r'<c r="([A-Z]+\d+)"([^>]*)><f>([^<]*)</f>(?:<v\s*/>|<v></v>)?</c>')
+FORMULA_TOKEN = re.compile(
+    r'(?P<space>\s+)|(?P<string>"(?:[^"]|"")*")|(?P<number>\d+(?:\.\d+)?)|(?P<function>[A-Za-z][A-Za-z0-9.]*\()'
+    r"|(?P<reference>(?:(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!)?\$?[A-Z]{1,3}\$?\d*(?::\$?[A-Z]{1,3}\$?\d*)?)"
+    r"|(?P<operator>[&=,()])"
+)
+EXCEL_MAX_ROW = 1048576
+ZIP_EPOCH = datetime.datetime(1980, 1, 1)  # earliest date a zip entry can carry
+
+# Last parsed Impact_Assessments rates, keyed by a digest of the raw text columns
+_impact_rates = {}
+
+def create_bos_workbook(metric_history=None, catalog=None, change_log=None, sli_results=None,
+                        backtest=None, slo_recommendations=None, impact_cost=None, created=None):
+    """Create the complete BOS Excel workbook, stamped as created now unless a UTC time is given"""
     wb = Workbook()
+    wb.properties.created = created or datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
     
     # Remove default sheet
     wb.remove(wb.active)
@@ -33,17 +297,47 @@ def create_bos_workbook():
     slo_sheet = wb.create_sheet("SLO_Configurations")
     impact_sheet = wb.create_sheet("Impact_Assessments")
     ops_sheet = wb.create_sheet("Operational_Metadata")
+    trend_sheet = wb.create_sheet("Trend_Data")
+    sli_results_sheet = wb.create_sheet("SLI_Results")
     
     # Create sample data matching CSV structure
-    create_data_sheets(wb)
+    create_data_sheets(wb, catalog)
+    create_trend_sheet(wb, metric_history)
+    create_sli_results_sheet(wb, sli_results if sli_results is not None else metric_sli_results(metric_history))
+    create_change_log_sheet(wb, change_log)
+    create_backtest_sheet(wb, backtest)
+    create_slo_recommendations_sheet(wb, slo_recommendations)
+    create_impact_cost_sheet(wb, impact_cost)
     create_entry_forms(wb)
     create_service_model_sheet(wb)
     create_dashboard_sheet(wb)
+    set_default_selection(wb, catalog)
     
     return wb
 
-def create_data_sheets(wb):
-    """Create the 5 normalized data sheets with sample data"""
+def create_data_sheets(wb, catalog=None):
+    """Create the 5 normalized data sheets, with sample data unless a catalog is given"""
+    if catalog is None:
+        catalog = create_sample_catalog()
+    
+    for table in CATALOG_TABLES:
+        write_data_to_sheet(wb[table], catalog[table])
+
+def set_default_selection(wb, catalog=None):
+    """Preselect the first catalog service on the dashboard, model and entry forms"""
+    if catalog is None:
+        return
+    services = catalog["Services"]
+    if len(services) < 2:
+        return
+    service = dict(zip(services[0], services[1]))
+    wb["Dashboard"]["B3"] = service["displayName"]
+    wb["Service_Data_Model"]["B3"] = service["displayName"]
+    for form in ["PO_Entry_Form", "Dev_Entry_Form", "Ops_Entry_Form"]:
+        wb[form]["B3"] = service["service_id"]
+
+def create_sample_catalog():
+    """Sample data for the 5 catalog tables, as header row plus data rows"""
     
     # Services data
     services_data = [
@@ -79,7 +373,15 @@ def create_data_sheets(wb):
          "request_type='CREDIT_CHECK' AND source='LOAN_APP'",
          "", "", "", "SELECT COUNT(*) WHERE status='SUCCESS' AND score BETWEEN 300 AND 850",
          "sql", '{"database":"lending","table":"credit_checks"}', "platform-engineering-team",
-         "Uses Equifax/Experian/TransUnion APIs with 5s timeout"]
+         "Uses Equifax/Experian/TransUnion APIs with 5s timeout"],
+        ["SVC002", "credit-check-latency-p99", "Credit Check Response Time", "thresholdMetric",
+         "Credit check answers within 5 seconds",
+         "",
+         "All credit check requests for loan applications",
+         "request_type='CREDIT_CHECK' AND source='LOAN_APP'",
+         "response_time_ms", "lt", 5000, "SELECT response_time_ms WHERE request_type='CREDIT_CHECK'",
+         "sql", '{"database":"lending","table":"credit_checks"}', "platform-engineering-team",
+         "p99 compared per 5-minute slice"]
     ]
     
     # SLO Configurations data
@@ -130,45 +432,164 @@ def create_data_sheets(wb):
          "Credit bureau integration service"]
     ]
     
-    # Write data to sheets
-    write_data_to_sheet(wb["Services"], services_data)
-    write_data_to_sheet(wb["SLI_Definitions"], sli_data)
-    write_data_to_sheet(wb["SLO_Configurations"], slo_data)
-    write_data_to_sheet(wb["Impact_Assessments"], impact_data)
-    write_data_to_sheet(wb["Operational_Metadata"], ops_data)
+    return {
+        "Services": services_data,
+        "SLI_Definitions": sli_data,
+        "SLO_Configurations": slo_data,
+        "Impact_Assessments": impact_data,
+        "Operational_Metadata": ops_data,
+    }
+
+def load_catalog(source, service_ids=None, business_unit=None):
+    """Load the 5 catalog tables from a SQLite catalog, a directory of <table>.csv files or a built workbook"""
+    if is_catalog_db(source):
+        return load_catalog_db(source, service_ids, business_unit)
+    if service_ids is not None or business_unit is not None:
+        return filter_catalog(load_catalog(source), service_ids, business_unit)
+    
+    if os.path.isdir(source):
+        frames = {table: read_catalog_csv(source, table) for table in CATALOG_TABLES}
+    else:
+        frames = pd.read_excel(source, sheet_name=CATALOG_TABLES, dtype=str, keep_default_na=False)
+    
+    return {table: catalog_rows(frame) for table, frame in frames.items()}
+
+def read_catalog_csv(source_dir, table):
+    """Read one catalog table CSV with every field as text, rejecting it without its key or display columns"""
+    frame = pd.read_csv(os.path.join(source_dir, f"{table}.csv"), dtype=str, keep_default_na=False)
+    missing = [column for column in CATALOG_KEYS[table] + CATALOG_DISPLAY_COLUMNS.get(table, [])
+               if column not in frame.columns]
+    if missing:
+        raise ValueError(f"{table}.csv has no {', '.join(missing)} column")
+    return frame
+
+def catalog_rows(frame):
+    """Convert a text DataFrame to catalog rows with typed numeric and boolean fields"""
+    frame = frame.astype(object)
+    # Text like version "1.0" stays text, only the numeric and boolean fields are converted
+    for column in frame.columns.intersection(NUMERIC_COLUMNS):
+        values = pd.to_numeric(frame[column], errors="coerce")
+        whole = values.notna() & (values % 1 == 0)
+        frame.loc[values.notna(), column] = values[values.notna()].astype(object)
+        frame.loc[whole, column] = values[whole].astype("int64").astype(object)
+    for column in frame.columns.intersection(BOOLEAN_COLUMNS):
+        lowered = frame[column].str.lower()
+        frame.loc[lowered == "true", column] = True
+        frame.loc[lowered == "false", column] = False
+    # Same shape as create_sample_catalog: header row followed by plain Python values
+    return [list(frame.columns)] + frame.values.tolist()
+
+def is_catalog_db(source):
+    """Whether a catalog source names a SQLite database"""
+    return source.lower().endswith(SQLITE_SUFFIXES)
+
+def open_catalog_db(path):
+    """Open the SQLite catalog in WAL mode so readers and a writer do not block each other"""
+    connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+def write_catalog_db(catalog, path):
+    """Replace the catalog tables of a SQLite database in one transaction with bulk inserts"""
+    connection = open_catalog_db(path)
+    try:
+        connection.execute("BEGIN IMMEDIATE")
+        for table in CATALOG_TABLES:
+            header = catalog[table][0]
+            columns = ", ".join(
+                f'"{column}" {"NUMERIC" if column in NUMERIC_COLUMNS else "INTEGER" if column in BOOLEAN_COLUMNS else "TEXT"}'
+                for column in header
+            )
+            placeholders = ", ".join("?" for _ in header)
+            connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+            connection.execute(f'CREATE TABLE "{table}" ({columns})')
+            connection.executemany(f'INSERT INTO "{table}" VALUES ({placeholders})', catalog[table][1:])
+            for column in CATALOG_INDEX_COLUMNS:
+                if column in header:
+                    connection.execute(f'CREATE INDEX "idx_{table}_{column}" ON "{table}" ("{column}")')
+        connection.execute("COMMIT")
+    except BaseException:
+        connection.execute("ROLLBACK")
+        raise
+    finally:
+        connection.close()
+
+def load_catalog_db(path, service_ids=None, business_unit=None):
+    """Load catalog tables from SQLite, filtering services through the indexes instead of in Python"""
+    # --services and --business-unit together select the listed services of that unit, as filter_catalog does
+    conditions, params = [], []
+    if service_ids is not None:
+        conditions.append("service_id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(list(service_ids)))
+    if business_unit is not None:
+        conditions.append('service_id IN (SELECT service_id FROM "Services" WHERE businessUnit = ?)')
+        params.append(business_unit)
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    
+    connection = open_catalog_db(path)
+    try:
+        # One read transaction so all 5 tables come from the same snapshot
+        connection.execute("BEGIN")
+        catalog = {}
+        for table in CATALOG_TABLES:
+            cursor = connection.execute(f'SELECT * FROM "{table}"{where} ORDER BY rowid', params)
+            header = [column[0] for column in cursor.description]
+            boolean_idx = [i for i, column in enumerate(header) if column in BOOLEAN_COLUMNS]
+            rows = [list(row) for row in cursor]
+            for row in rows:
+                for i in boolean_idx:
+                    if row[i] in (0, 1):
+                        row[i] = bool(row[i])
+            catalog[table] = [header] + rows
+        connection.execute("COMMIT")
+    finally:
+        connection.close()
+    return catalog
+
+def write_catalog_csvs(catalog, target_dir):
+    """Write the 5 catalog tables as <table>.csv files that --catalog and --watch read"""
+    os.makedirs(target_dir, exist_ok=True)
+    for table in CATALOG_TABLES:
+        rows = catalog[table]
+        pd.DataFrame(rows[1:], columns=rows[0]).to_csv(os.path.join(target_dir, f"{table}.csv"), index=False)
+
+def register_data_styles(wb):
+    """Add the data sheet header and cell styles to the workbook once"""
+    if DATA_CELL_STYLE in wb.named_styles:
+        return
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    wb.add_named_style(NamedStyle(
+        name=DATA_HEADER_STYLE,
+        font=Font(bold=True, color="FFFFFF"),
+        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+        alignment=Alignment(horizontal="center"),
+        border=border,
+    ))
+    wb.add_named_style(NamedStyle(name=DATA_CELL_STYLE, border=border))
 
 def write_data_to_sheet(sheet, data):
     """Write data array to worksheet with formatting"""
+    # Cells share two named styles; building style objects per cell dominated large builds
+    register_data_styles(sheet.parent)
+    widths = {}
     for row_idx, row_data in enumerate(data, 1):
+        style = DATA_HEADER_STYLE if row_idx == 1 else DATA_CELL_STYLE
         for col_idx, value in enumerate(row_data, 1):
-            cell = sheet.cell(row=row_idx, column=col_idx, value=value)
-            
-            # Header formatting
-            if row_idx == 1:
-                cell.font = Font(bold=True, color="FFFFFF")
-                cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-                cell.alignment = Alignment(horizontal="center")
-            
-            # Border for all cells
-            cell.border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
+            sheet.cell(row=row_idx, column=col_idx, value=value).style = style
+            length = len(str(value)) if value is not None else 0
+            if length > widths.get(col_idx, 0):
+                widths[col_idx] = length
     
     # Auto-adjust column widths
-    for column in sheet.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
+    for col_idx, max_length in widths.items():
         adjusted_width = min(max_length + 2, 50)  # Cap at 50
-        sheet.column_dimensions[column_letter].width = adjusted_width
+        sheet.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
 
 def create_entry_forms(wb):
     """Create the three persona-specific data entry forms"""
@@ -736,6 +1157,7 @@ def create_dashboard_sheet(wb):
     
     # Enhanced stats boxes
     create_enhanced_stats_boxes(sheet, 15)
+    add_trend_chart(sheet, wb["Trend_Data"], "H15")
     
     # SLI Details with professional formatting
     sli_details = [
@@ -853,10 +1275,10 @@ def create_professional_section_header(sheet, title, row, color):
 def create_enhanced_stats_boxes(sheet, row):
     """Create professional, dynamic stats indicator boxes"""
     stats_data = [
-        ("CURRENT", '=IF(A1="SVC001","99.2%",IF(A1="SVC002","97.8%","No Data"))', "2F5597"),
+        ("CURRENT", '=IFERROR(TEXT(INDEX(SLI_Results!E:E,MATCH(A1,SLI_Results!A:A,0)),"0.0#") & "%", "No Data")', "2F5597"),
         ("TARGET", '=IFERROR(INDEX(SLO_Configurations!B:B,MATCH(A1,SLO_Configurations!A:A,0)) & "%", "No Target")', "2F5597"),
-        ("STATUS", '=IF(A1="SVC001","⚠️ WARNING",IF(A1="SVC002","✅ OK","Unknown"))', "2F5597"),
-        ("TREND", '"📊 Stable"', "2F5597")
+        ("STATUS", '=IFERROR(INDEX(SLI_Results!F:F,MATCH(A1,SLI_Results!A:A,0)), "Unknown")', "2F5597"),
+        ("TREND", '=IFERROR(INDEX(Trend_Data!B:B,MATCH(A1,Trend_Data!A:A,0)), "📊 No Data")', "2F5597")
     ]
     
     # Create stats boxes in columns A, C, E, G
@@ -908,7 +1330,7 @@ def create_stats_boxes(sheet, row):
     sheet[f"A{row+1}"] = '=IF(A1="SVC001","99.2%",IF(A1="SVC002","97.8%",""))'
     sheet[f"C{row+1}"] = '=IF(A1="","",INDEX(SLO_Configurations!B:B,MATCH(A1,SLO_Configurations!A:A,0)) & "%")'
     sheet[f"E{row+1}"] = '=IF(A1="SVC001","⚠️ WARNING",IF(A1="SVC002","✅ OK",""))'
-    sheet[f"G{row+1}"] = "▄▃▅▆▇▆▅▄▃▅▆▇▆▅"  # Simple ASCII trend
+    sheet[f"G{row+1}"] = '=IF(A1="","",IFERROR(INDEX(Trend_Data!B:B,MATCH(A1,Trend_Data!A:A,0)),""))'
     
     # Styling for stats boxes
     for col in ['A', 'C', 'E', 'G']:
@@ -936,6 +1358,614 @@ def create_stats_boxes(sheet, row):
         if col == 'E':  # Status column
             value_cell.fill = PatternFill(start_color="FFF2CC", end_color="FFF2CC", fill_type="solid")
 
+def load_metric_history(metrics_path):
+    """Load SLI metric history as one success rate per service and timestamp"""
+    if not metrics_path or not os.path.exists(metrics_path):
+        return None
+    
+    metrics = pd.read_csv(metrics_path, comment="#", usecols=["timestamp", "service_id", "good_events", "total_events"])
+    
+    # Services with several SLIs report one combined rate per timestamp
+    history = metrics.groupby(["service_id", "timestamp"], sort=True)[["good_events", "total_events"]].sum().reset_index()
+    history["success_rate"] = np.where(
+        history["total_events"] > 0,
+        history["good_events"] / history["total_events"].where(history["total_events"] > 0) * 100,
+        np.nan,
+    )
+    return history.dropna(subset=["success_rate"])
+
+def downsample_lttb(x, y, n_out):
+    """Downsample a series to n_out points with Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return x, y
+    
+    # First and last points are kept, the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    # Bucket averages in one pass; bucket i is compared against the average of bucket i + 1
+    starts = np.append(edges[1:-1], n - 1)
+    lengths = np.diff(np.append(starts, n))
+    avg_xs = np.add.reduceat(x, starts) / lengths
+    avg_ys = np.add.reduceat(y, starts) / lengths
+    
+    anchor = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        avg_x, avg_y = avg_xs[i], avg_ys[i]
+        
+        # Keep the point forming the largest triangle with the previous pick and the next bucket average
+        area = np.abs((x[anchor] - avg_x) * (y[start:end] - y[anchor])
+                      - (x[anchor] - x[start:end]) * (avg_y - y[anchor]))
+        anchor = start + int(area.argmax())
+        selected[i + 1] = anchor
+    
+    return x[selected], y[selected]
+
+def classify_trend(values):
+    """Describe a downsampled series as improving, declining or stable"""
+    if len(values) < 3:
+        return "📊 Stable"
+    third = len(values) // 3
+    change = values[-third:].mean() - values[:third].mean()
+    if change > TREND_STABLE_BAND:
+        return "📈 Improving"
+    if change < -TREND_STABLE_BAND:
+        return "📉 Declining"
+    return "📊 Stable"
+
+def service_trend_series(metric_history, service_ids):
+    """Downsampled success rate series of each listed service that has metric history"""
+    series_by_service = {}
+    if metric_history is None:
+        return series_by_service
+    
+    # One stable sort by service, then each series is a slice of the sorted arrays
+    history = metric_history[metric_history["service_id"].isin(service_ids)].sort_values("service_id", kind="stable")
+    ids = history["service_id"].to_numpy()
+    x = history["timestamp"].to_numpy(dtype=float)
+    y = history["success_rate"].to_numpy(dtype=float)
+    bounds = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    for start, end in zip(np.append(0, bounds), np.append(bounds, len(ids))):
+        if end > start:
+            series_by_service[ids[start]] = downsample_lttb(x[start:end], y[start:end], TREND_POINTS)[1]
+    return series_by_service
+
+def create_trend_sheet(wb, metric_history):
+    """Pack downsampled trend series for all catalog services into one hidden sheet"""
+    sheet = wb["Trend_Data"]
+    sheet.sheet_state = "hidden"
+    
+    headers = ["service_id", "trend", "latest"] + [f"point_{i}" for i in range(1, TREND_POINTS + 1)]
+    sheet.append(headers)
+    
+    service_ids = [row[0] for row in wb["Services"].iter_rows(min_row=2, max_col=1, values_only=True) if row[0]]
+    series_by_service = service_trend_series(metric_history, service_ids)
+    
+    rows = [
+        [service_id, classify_trend(values), round(float(values[-1]), 2)] + [round(float(v), 2) for v in values]
+        for service_id, values in series_by_service.items()
+    ]
+    last_row = TREND_FIRST_ROW + max(len(rows), 1) - 1
+    
+    # Row 2 follows the Dashboard selection and feeds the chart
+    sheet["A2"] = "selected"
+    for col_idx in range(4, TREND_POINTS + 4):
+        col = sheet.cell(row=1, column=col_idx).column_letter
+        sheet.cell(row=2, column=col_idx).value = (
+            f'=IFERROR(IF(INDEX({col}${TREND_FIRST_ROW}:{col}${last_row},'
+            f'MATCH(Dashboard!$A$1,$A${TREND_FIRST_ROW}:$A${last_row},0))="",NA(),'
+            f'INDEX({col}${TREND_FIRST_ROW}:{col}${last_row},'
+            f'MATCH(Dashboard!$A$1,$A${TREND_FIRST_ROW}:$A${last_row},0))),NA())'
+        )
+    
+    for row_idx, row_data in enumerate(rows, TREND_FIRST_ROW):
+        for col_idx, value in enumerate(row_data, 1):
+            sheet.cell(row=row_idx, column=col_idx, value=value)
+
+def add_trend_chart(sheet, trend_sheet, anchor):
+    """Add a sparkline-style line chart of the selected service's trend"""
+    chart = LineChart()
+    chart.legend = None
+    chart.width = 5.5
+    chart.height = 2.0
+    chart.x_axis.delete = True
+    chart.y_axis.delete = True
+    chart.y_axis.majorGridlines = None
+    
+    data = Reference(trend_sheet, min_col=4, max_col=TREND_POINTS + 3, min_row=2, max_row=2)
+    chart.add_data(data, from_rows=True, titles_from_data=False)
+    series = chart.series[0]
+    series.smooth = False
+    series.graphicalProperties.line.solidFill = "2F5597"
+    series.graphicalProperties.line.width = 15875  # 1.25pt in EMU
+    
+    sheet.add_chart(chart, anchor)
+
+def parse_time_window(window):
+    """Seconds in an SLO time window such as "7d", "28d" or "24h", None when it cannot be read"""
+    match = re.fullmatch(r"\s*(\d+)\s*([mhdw])\s*", str(window or "").lower())
+    if not match:
+        return None
+    return int(match.group(1)) * TIME_WINDOW_UNITS[match.group(2)]
+
+def sli_data_source(details):
+    """(database, table) named by a dataSourceDetails JSON document, None when it names neither safely"""
+    try:
+        source = json.loads(details) if details else None
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(source, dict):
+        return None
+    database, table = source.get("database"), source.get("table")
+    if not all(isinstance(name, str) and SQL_IDENTIFIER.match(name) for name in (database, table)):
+        return None
+    return database, table
+
+def authorize_event_query(action, arg1, arg2, database, trigger):
+    """sqlite3 authorizer letting compiled SLI criteria read tables and call functions, nothing else"""
+    if action in (sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION):
+        return sqlite3.SQLITE_OK
+    return sqlite3.SQLITE_DENY
+
+class EventStorePool:
+    """Read-only connections to the event store, attaching each <database>.db under its name when a scan needs it"""
+    
+    def __init__(self, store_dir, size=DEFAULT_SLI_WORKERS):
+        self.store_dir = store_dir
+        self.databases = sorted(
+            name[:-3] for name in os.listdir(store_dir)
+            if name.endswith(".db") and SQL_IDENTIFIER.match(name[:-3])
+        )
+        self._idle = queue.Queue()
+        self._connections = [self._connect() for _ in range(max(size, 1))]
+        # Databases attached to each connection, least recently used first
+        self._attached = {connection: OrderedDict() for connection in self._connections}
+        for connection in self._connections:
+            self._idle.put(connection)
+    
+    def _connect(self):
+        """Open one connection that may only read"""
+        connection = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+        connection.execute("PRAGMA query_only = ON")
+        # Criteria come from the catalog, so compiled queries may only read
+        connection.set_authorizer(authorize_event_query)
+        return connection
+    
+    def _attach(self, connection, database):
+        """Attach one event database read-only, detaching the least recently used past SQLite's limit"""
+        attached = self._attached[connection]
+        if database in attached:
+            attached.move_to_end(database)
+            return
+        if database not in self.databases:
+            raise sqlite3.OperationalError(f"no {database}.db in {self.store_dir}")
+        
+        # The authorizer denies ATTACH and DETACH, so it is lifted while this borrower holds the connection
+        path = os.path.abspath(os.path.join(self.store_dir, f"{database}.db"))
+        connection.set_authorizer(None)
+        try:
+            while len(attached) >= SQLITE_MAX_ATTACHED:
+                connection.execute(f"DETACH DATABASE {attached.popitem(last=False)[0]}")
+            connection.execute(f"ATTACH DATABASE ? AS {database}", (f"file:{pathname2url(path)}?mode=ro",))
+            # Opening is lazy, so read the schema now to report unreadable files at attach time
+            connection.execute(f"SELECT COUNT(*) FROM {database}.sqlite_master").fetchone()
+        except sqlite3.Error:
+            with contextlib.suppress(sqlite3.Error):
+                connection.execute(f"DETACH DATABASE {database}")
+            raise
+        finally:
+            connection.set_authorizer(authorize_event_query)
+        attached[database] = True
+    
+    @contextlib.contextmanager
+    def connection(self, database=None):
+        """Borrow an idle connection for the duration of a with block, with the named database attached
+        
+        Raises sqlite3.Error when the database has no file in the store or cannot be opened.
+        """
+        connection = self._idle.get()
+        try:
+            if database is not None:
+                self._attach(connection, database)
+            yield connection
+        finally:
+            self._idle.put(connection)
+    
+    def close(self):
+        """Close every pooled connection"""
+        for connection in self._connections:
+            connection.close()
+
+def sli_condition(sli, source, columns):
+    """SQL condition selecting the total events of an SLI inside its SLO window"""
+    condition = f"({sli['total']}\n)"
+    if sli["window"] and EVENT_TIME_COLUMN in columns:
+        # SLO windows end at the newest event so replayed stores evaluate like live ones
+        condition += (f' AND "{EVENT_TIME_COLUMN}" >= datetime((SELECT MAX("{EVENT_TIME_COLUMN}") FROM {source}),'
+                      f" '-{sli['window']} seconds')")
+    return condition
+
+def compile_sli_group(connection, database, table, slis):
+    """Compile the SLIs reading one table into a single conditional-aggregation query"""
+    source = f'{database}."{table}"'
+    columns = [column[0] for column in connection.execute(f"SELECT * FROM {source} LIMIT 0").description]
+    selects, compiled = [], []
+    for sli in slis:
+        # Each predicate must compile on its own so one bad definition does not sink the group;
+        # the newline keeps a trailing "--" comment from swallowing the closing parenthesis
+        try:
+            for criteria in (sli["good"], sli["total"]):
+                connection.execute(f"SELECT 1 FROM {source} WHERE ({criteria}\n) LIMIT 0")
+        except sqlite3.Error as error:
+            print(f"Skipping SLI {sli['service_id']} {sli['sliName']}: {error}")
+            continue
+        condition = sli_condition(sli, source, columns)
+        selects.append(f"COALESCE(SUM(CASE WHEN {condition} THEN 1 ELSE 0 END), 0)")
+        selects.append(f"COALESCE(SUM(CASE WHEN {condition} AND ({sli['good']}\n) THEN 1 ELSE 0 END), 0)")
+        compiled.append(sli)
+    if not compiled:
+        return None, []
+    return f"SELECT {', '.join(selects)} FROM {source}", compiled
+
+def evaluate_sli_group(pool, database, table, slis):
+    """Good and total event counts of the SLIs reading one table, from a single scan"""
+    try:
+        with pool.connection(database) as connection:
+            query, compiled = compile_sli_group(connection, database, table, slis)
+            counts = connection.execute(query).fetchone() if query else ()
+    except sqlite3.Error as error:
+        print(f"Skipping {database}.{table}: {error}")
+        return []
+    return [
+        dict(sli, total_events=int(counts[2 * i]), good_events=int(counts[2 * i + 1]), source=f"{database}.{table}")
+        for i, sli in enumerate(compiled)
+    ]
+
+class QuantileSketch:
+    """DDSketch-style quantile sketch: relative-accuracy log bins, mergeable, bounded in size"""
+    
+    def __init__(self, relative_accuracy=SKETCH_RELATIVE_ACCURACY, max_bins=SKETCH_MAX_BINS):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.max_bins = max_bins
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+    
+    def add(self, samples):
+        """Add an array of non-negative samples (NaN is ignored, negatives count as zero)"""
+        samples = np.asarray(samples, dtype=float)
+        samples = samples[~np.isnan(samples)]
+        positive = samples[samples > 0]
+        self.zero_count += len(samples) - len(positive)
+        self.count += len(samples)
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(np.int64), return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0) + count
+            self._collapse()
+        return self
+    
+    def merge(self, other):
+        """Fold another sketch with the same accuracy into this one"""
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self._collapse()
+        return self
+    
+    def _collapse(self):
+        """Fold the lowest bins together once there are more than max_bins"""
+        if len(self.bins) <= self.max_bins:
+            return
+        keys = sorted(self.bins)
+        target = keys[-self.max_bins]
+        for key in keys[:-self.max_bins]:
+            self.bins[target] += self.bins.pop(key)
+    
+    def values(self):
+        """Representative value and count of every bin, zero bin first"""
+        keys = np.array(sorted(self.bins), dtype=float)
+        values = np.concatenate([[0.0], 2 * np.power(self.gamma, keys) / (self.gamma + 1)])
+        counts = np.array([self.zero_count] + [self.bins[key] for key in sorted(self.bins)])
+        return values, counts
+    
+    def quantile(self, q):
+        """Value at quantile q (0-1), None for an empty sketch"""
+        if not self.count:
+            return None
+        values, counts = self.values()
+        return float(values[np.searchsorted(np.cumsum(counts), q * (self.count - 1), side="right")])
+    
+    def count_meeting(self, operator, threshold):
+        """Samples satisfying "<sample> <operator> <threshold>" for lt/lte/gt/gte"""
+        values, counts = self.values()
+        return int(counts[THRESHOLD_OPERATORS[operator](values, threshold)].sum())
+
+def compile_threshold_group(connection, database, table, slis):
+    """Compile the threshold SLIs reading one table into a single streaming query over a rowid range"""
+    source = f'{database}."{table}"'
+    columns = [column[0] for column in connection.execute(f"SELECT * FROM {source} LIMIT 0").description]
+    selects, compiled = [], []
+    for sli in slis:
+        try:
+            connection.execute(f"SELECT ({sli['query']}\n) FROM {source} WHERE ({sli['total']}\n) LIMIT 0")
+        except sqlite3.Error as error:
+            print(f"Skipping SLI {sli['service_id']} {sli['sliName']}: {error}")
+            continue
+        selects.append(f"CASE WHEN {sli_condition(sli, source, columns)} THEN ({sli['query']}\n) END")
+        compiled.append(sli)
+    if not compiled:
+        return None, [], (0, -1)
+    
+    epoch = f"CAST(strftime('%s', \"{EVENT_TIME_COLUMN}\") AS INTEGER)" if EVENT_TIME_COLUMN in columns else "0"
+    query = f"SELECT {epoch}, {', '.join(selects)} FROM {source} WHERE rowid BETWEEN ? AND ?"
+    first, last = connection.execute(f"SELECT MIN(rowid), MAX(rowid) FROM {source}").fetchone()
+    return query, compiled, (first or 0, last if last is not None else -1)
+
+def scan_threshold_partition(pool, database, query, slis, first_rowid, last_rowid):
+    """Stream one rowid range into per-slice quantile sketches
+    
+    Returns one dict of slice -> sketch per SLI, and {SLI position: error} for
+    SLIs whose thresholdQuery_Dev returned values that are not numbers.
+    """
+    sketches = [{} for _ in slis]
+    failed = {}
+    with pool.connection(database) as connection:
+        cursor = connection.execute(query, (first_rowid, last_rowid))
+        while True:
+            rows = cursor.fetchmany(STREAM_CHUNK_ROWS)
+            if not rows:
+                break
+            # Columns are converted one at a time so a text-valued query only fails its own SLI
+            columns = list(zip(*rows))
+            epochs = np.array(columns[0], dtype=float)
+            for i, sli in enumerate(slis):
+                if i in failed:
+                    continue
+                try:
+                    samples = np.array(columns[i + 1], dtype=float)
+                except (TypeError, ValueError) as error:
+                    failed[i] = error
+                    continue
+                valid = ~np.isnan(samples)
+                slices = (epochs[valid] // sli["slice"]).astype(np.int64)
+                samples = samples[valid]
+                
+                # Group the chunk by slice, then add each slice's samples in one call
+                order = np.argsort(slices, kind="stable")
+                keys, starts = np.unique(slices[order], return_index=True)
+                for key, part in zip(keys.tolist(), np.split(samples[order], starts[1:])):
+                    sketches[i].setdefault(key, QuantileSketch()).add(part)
+    return sketches, failed
+
+def summarize_threshold_sli(sli, slice_sketches, source):
+    """Quantiles, threshold compliance and compliant time slices of one threshold SLI"""
+    overall = QuantileSketch()
+    for sketch in slice_sketches.values():
+        overall.merge(sketch)
+    operator, threshold = sli["operator"], sli["threshold"]
+    
+    # lt/lte thresholds bound the slow tail (p99), gt/gte thresholds bound the low tail (p1)
+    tail_q = 0.99 if operator in ("lt", "lte") else 0.01
+    tail = overall.quantile(tail_q)
+    compliant_slices = 0
+    for sketch in slice_sketches.values():
+        if sli["slice_target"] is not None:
+            compliant_slices += sketch.count_meeting(operator, threshold) * 100 >= sli["slice_target"] * sketch.count
+        else:
+            compliant_slices += bool(THRESHOLD_OPERATORS[operator](sketch.quantile(tail_q), threshold))
+    
+    return dict(
+        sli, good_events=overall.count_meeting(operator, threshold), total_events=overall.count, source=source,
+        p50=overall.quantile(0.5), p95=overall.quantile(0.95), p99=overall.quantile(0.99),
+        thresholdOperator=operator, thresholdValue=threshold,
+        tail_meets_threshold=None if tail is None else bool(THRESHOLD_OPERATORS[operator](tail, threshold)),
+        slices=len(slice_sketches), compliant_slices=int(compliant_slices),
+    )
+
+def evaluate_slis(catalog, pool, workers=DEFAULT_SLI_WORKERS):
+    """Evaluate every SLI against the event store, one scan per source table and SLI type"""
+    slo_header = catalog["SLO_Configurations"][0]
+    slos = {}
+    for row in catalog["SLO_Configurations"][1:]:
+        slos.setdefault(row[0], dict(zip(slo_header, row)))
+    
+    # SLIs reading the same table share one query: ratio SLIs count events, threshold SLIs stream samples
+    ratio_groups, threshold_groups = {}, {}
+    sli_header = catalog["SLI_Definitions"][0]
+    for position, row in enumerate(catalog["SLI_Definitions"][1:]):
+        sli = dict(zip(sli_header, row))
+        source = sli_data_source(sli.get("dataSourceDetails"))
+        slo = slos.get(sli["service_id"], {})
+        entry = {
+            "position": position, "service_id": sli["service_id"], "sliName": sli.get("sliName"),
+            "total": sli.get("totalEventsCriteria_Dev"), "window": parse_time_window(slo.get("timeWindow")),
+        }
+        if source is None or not entry["total"]:
+            continue
+        if sli.get("sliType") == "thresholdMetric":
+            if not sli.get("thresholdQuery_Dev") or sli.get("thresholdOperator") not in THRESHOLD_OPERATORS:
+                continue
+            try:
+                entry["threshold"] = float(sli.get("thresholdValue"))
+                slice_target = slo.get("timeSliceTarget")
+                entry["slice_target"] = float(slice_target) if slice_target not in ("", None) else None
+            except (TypeError, ValueError):
+                continue
+            entry.update(query=sli["thresholdQuery_Dev"], operator=sli["thresholdOperator"],
+                         slice=parse_time_window(slo.get("timeSliceWindow"))
+                         or parse_time_window(DEFAULT_TIME_SLICE_WINDOW))
+            threshold_groups.setdefault(source, []).append(entry)
+        elif sli.get("goodEventsCriteria_Dev"):
+            entry["good"] = sli["goodEventsCriteria_Dev"]
+            ratio_groups.setdefault(source, []).append(entry)
+    
+    # Threshold queries are compiled once, then every table is split into rowid ranges across the workers.
+    # Scans are queued database by database, so connections attach each one once even past SQLite's limit
+    threshold_scans = []
+    for (database, table), slis in sorted(threshold_groups.items()):
+        try:
+            with pool.connection(database) as connection:
+                query, compiled, (first, last) = compile_threshold_group(connection, database, table, slis)
+        except sqlite3.Error as error:
+            print(f"Skipping {database}.{table}: {error}")
+            continue
+        if query:
+            bounds = np.linspace(first, last + 1, max(workers, 1) + 1).astype(np.int64)
+            threshold_scans.append((database, f"{database}.{table}", query, compiled,
+                                    list(zip(bounds[:-1], bounds[1:] - 1))))
+    
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = [executor.submit(evaluate_sli_group, pool, database, table, slis[start:start + SLI_QUERY_CHUNK])
+                   for (database, table), slis in sorted(ratio_groups.items())
+                   for start in range(0, len(slis), SLI_QUERY_CHUNK)]
+        partitions = [
+            (source, compiled, [executor.submit(scan_threshold_partition, pool, database, query, compiled,
+                                                int(low), int(high))
+                                for low, high in ranges if high >= low])
+            for database, source, query, compiled, ranges in threshold_scans
+        ]
+        records = [record for future in futures for record in future.result()]
+        
+        # Per-partition sketches are merged slice by slice; raw samples are never revisited
+        for source, compiled, partition_futures in partitions:
+            merged = [{} for _ in compiled]
+            failed = {}
+            for future in partition_futures:
+                sketches, partition_failed = future.result()
+                failed.update(partition_failed)
+                for i, slice_sketches in enumerate(sketches):
+                    for key, sketch in slice_sketches.items():
+                        if key in merged[i]:
+                            merged[i][key].merge(sketch)
+                        else:
+                            merged[i][key] = sketch
+            for i, error in failed.items():
+                print(f"Skipping SLI {compiled[i]['service_id']} {compiled[i]['sliName']}: "
+                      f"thresholdQuery_Dev returned a non-numeric value ({error})")
+            records.extend(summarize_threshold_sli(sli, merged[i], source)
+                           for i, sli in enumerate(compiled) if i not in failed)
+    
+    records.sort(key=lambda record: record["position"])
+    return pd.DataFrame(records, columns=SLI_RECORD_COLUMNS)
+
+def metric_sli_results(metric_history):
+    """Good and total events per service summed over the metric history, for builds without an event store"""
+    if metric_history is None:
+        return pd.DataFrame(columns=SLI_RECORD_COLUMNS)
+    totals = metric_history.groupby("service_id", sort=False)[["good_events", "total_events"]].sum().reset_index()
+    totals["sliName"] = None
+    totals["source"] = "metric history"
+    return totals.reindex(columns=SLI_RECORD_COLUMNS)
+
+def create_sli_results_sheet(wb, sli_results):
+    """Write evaluated SLIs to the hidden sheet behind the Dashboard CURRENT and STATUS boxes"""
+    sheet = wb["SLI_Results"]
+    sheet.sheet_state = "hidden"
+    sheet.append(SLI_RESULT_COLUMNS)
+    
+    slo_header = [cell.value for cell in wb["SLO_Configurations"][1]]
+    slos = {}
+    for row in wb["SLO_Configurations"].iter_rows(min_row=2, values_only=True):
+        if row[0] is not None:
+            slos.setdefault(row[0], dict(zip(slo_header, row)))
+    service_ids = {row[0] for row in wb["Services"].iter_rows(min_row=2, max_col=1, values_only=True) if row[0]}
+    sli_names = {}
+    for row in wb["SLI_Definitions"].iter_rows(min_row=2, max_col=2, values_only=True):
+        sli_names.setdefault(row[0], row[1])
+    
+    for record in sli_records(sli_results):
+        if record["service_id"] not in service_ids:
+            continue
+        row = sli_result_row(record, slos.get(record["service_id"]), sli_names.get(record["service_id"]))
+        if row is not None:
+            sheet.append([row[column] for column in SLI_RESULT_COLUMNS])
+
+def sli_records(sli_results):
+    """Evaluated SLIs as dicts of SLI_RECORD_COLUMNS, missing values as None"""
+    frame = sli_results.reindex(columns=SLI_RECORD_COLUMNS).astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+def sli_result_row(record, slo, sli_name=None):
+    """CURRENT and STATUS of one evaluated SLI, as a dict of SLI_RESULT_COLUMNS
+    
+    Shared by the SLI_Results sheet, the JSON API and the HTML site so all of
+    them show the same numbers. Returns None for an SLI without events; the
+    Dashboard then shows "No Data".
+    """
+    if not record["total_events"]:
+        return None
+    current = round(float(record["good_events"]) / float(record["total_events"]) * 100, 2)
+    row = {column: record.get(column) for column in SLI_RESULT_COLUMNS}
+    row.update(
+        sliName=record["sliName"] if record["sliName"] is not None else sli_name,
+        good_events=int(record["good_events"]), total_events=int(record["total_events"]),
+        current=current, status=service_status(current, slo),
+    )
+    for column in ("p50", "p95", "p99"):
+        if row[column] is not None:
+            row[column] = round(float(row[column]), 2)
+    return row
+
+def write_sample_event_store(store_dir, days=7, events_per_day=20000, seed=0):
+    """Write synthetic loans.wire_transfers and lending.credit_checks events matching the sample SLIs"""
+    os.makedirs(store_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    count = days * events_per_day
+    end = datetime.datetime.now().replace(microsecond=0)
+    offsets = np.sort(rng.integers(0, days * 86400, size=count))[::-1]
+    event_times = [(end - datetime.timedelta(seconds=int(offset))).strftime("%Y-%m-%d %H:%M:%S") for offset in offsets]
+    
+    # Wire transfers: ~0.8% of scheduled closing fundings fail or settle a day late
+    scheduled = [event_time[:10] for event_time in event_times]
+    closing_late = rng.random(count) < 0.003
+    wire_rows = list(zip(
+        event_times,
+        np.where(rng.random(count) < 0.9, "CLOSING_FUNDING", "REFUND").tolist(),
+        np.where(rng.random(count) < 0.995, "FUNDED", "FAILED").tolist(),
+        np.round(rng.lognormal(12.5, 0.5, count), 2).tolist(),
+        [None if missing else day for day, missing in zip(scheduled, rng.random(count) < 0.02)],
+        [(datetime.date.fromisoformat(day) + datetime.timedelta(days=1)).isoformat() if late else day
+         for day, late in zip(scheduled, closing_late)],
+    ))
+    
+    # Credit checks: ~2% of loan application checks time out, error or miss the score range
+    response_ms = np.round(rng.lognormal(6.5, 0.6, count)).astype(int)
+    response_ms[rng.random(count) < 0.012] = 5000 + rng.integers(0, 3000)
+    credit_rows = list(zip(
+        event_times,
+        np.where(rng.random(count) < 0.95, "CREDIT_CHECK", "SOFT_PULL").tolist(),
+        np.where(rng.random(count) < 0.9, "LOAN_APP", "PREQUAL").tolist(),
+        np.where(rng.random(count) < 0.993, "SUCCESS", "ERROR").tolist(),
+        np.where(rng.random(count) < 0.997, rng.integers(300, 851, count), 0).tolist(),
+        response_ms.tolist(),
+    ))
+    
+    stores = {
+        ("loans", "wire_transfers"): (
+            "event_time TEXT, request_type TEXT, status TEXT, amount REAL, scheduled_date TEXT, closing_date TEXT",
+            wire_rows),
+        ("lending", "credit_checks"): (
+            "event_time TEXT, request_type TEXT, source TEXT, status TEXT, score INTEGER, response_time_ms INTEGER",
+            credit_rows),
+    }
+    for (database, table), (columns, rows) in stores.items():
+        connection = sqlite3.connect(os.path.join(store_dir, f"{database}.db"))
+        try:
+            with connection:
+                connection.execute(f'DROP TABLE IF EXISTS "{table}"')
+                connection.execute(f'CREATE TABLE "{table}" ({columns})')
+                connection.executemany(f'INSERT INTO "{table}" VALUES (?, ?, ?, ?, ?, ?)', rows)
+                connection.execute(f'CREATE INDEX "idx_{table}_{EVENT_TIME_COLUMN}" ON "{table}" ({EVENT_TIME_COLUMN})')
+        finally:
+            connection.close()
+
 def apply_dashboard_formatting(sheet):
     """Apply consistent formatting to dashboard"""
     # Set default font
@@ -951,15 +1981,1804 @@ def apply_dashboard_formatting(sheet):
         cell.font = Font(bold=True, size=10)
         cell.fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
 
+def catalog_frame(rows, table):
+    """Catalog table as an all-text DataFrame with a unique record key"""
+    frame = pd.DataFrame(rows[1:], columns=rows[0])
+    for column in frame.columns:
+        values = frame[column]
+        if values.dtype.kind == "f":
+            # Workbooks store 99.0 as 99, so whole floats compare as integers
+            integral = values.notna() & (values % 1 == 0)
+            text = values.astype(str)
+            text[integral] = values[integral].astype("int64").astype(str)
+            frame[column] = text.where(values.notna(), "")
+    frame = frame.astype(object).where(frame.notna(), "").astype(str)
+    
+    # Repeated keys (e.g. two impacts of one category) are told apart by their order
+    keys = CATALOG_KEYS[table]
+    frame["_occurrence"] = frame.groupby(keys, sort=False).cumcount().astype(str)
+    frame["record_key"] = frame[keys[0]].str.cat(frame[keys[1:]], sep="/") if len(keys) > 1 else frame[keys[0]]
+    frame.loc[frame["_occurrence"] != "0", "record_key"] += "#" + frame["_occurrence"]
+    return frame
+
+def diff_catalog_table(table, old_rows, new_rows):
+    """Added, removed and changed records of one table, one row per changed field"""
+    keys = CATALOG_KEYS[table] + ["_occurrence", "record_key"]
+    old = catalog_frame(old_rows, table)
+    new = catalog_frame(new_rows, table)
+    
+    # Columns added or dropped between snapshots compare as empty
+    value_columns = [c for c in dict.fromkeys(list(old.columns) + list(new.columns)) if c not in keys]
+    old = old.reindex(columns=keys + value_columns, fill_value="")
+    new = new.reindex(columns=keys + value_columns, fill_value="")
+    
+    merged = old.merge(new, on=keys, how="outer", suffixes=("_old", "_new"), indicator=True)
+    
+    records = []
+    for change_type, side in [("added", "right_only"), ("removed", "left_only")]:
+        rows = merged[merged["_merge"] == side]
+        records.append(pd.DataFrame({
+            "service_id": rows["service_id"], "record_key": rows["record_key"],
+            "change_type": change_type, "field": "", "old_value": "", "new_value": "",
+        }))
+    
+    both = merged[merged["_merge"] == "both"]
+    old_values = both[[f"{c}_old" for c in value_columns]].to_numpy()
+    new_values = both[[f"{c}_new" for c in value_columns]].to_numpy()
+    changed = old_values != new_values
+    row_idx, col_idx = np.nonzero(changed)
+    records.append(pd.DataFrame({
+        "service_id": both["service_id"].to_numpy()[row_idx],
+        "record_key": both["record_key"].to_numpy()[row_idx],
+        "change_type": "changed",
+        "field": np.array(value_columns, dtype=object)[col_idx],
+        "old_value": old_values[changed],
+        "new_value": new_values[changed],
+    }))
+    
+    changes = pd.concat(records, ignore_index=True)
+    changes.insert(0, "table", table)
+    return changes[CHANGE_LOG_COLUMNS]
+
+def diff_catalogs(old_catalog, new_catalog, tables=None):
+    """Compare two catalog snapshots table by table"""
+    tables = CATALOG_TABLES if tables is None else tables
+    changes = [diff_catalog_table(table, old_catalog[table], new_catalog[table]) for table in tables]
+    if not changes:
+        return pd.DataFrame(columns=CHANGE_LOG_COLUMNS)
+    return pd.concat(changes, ignore_index=True).sort_values(["table", "record_key", "field"], kind="stable")
+
+def summarize_changes(change_log):
+    """Count changes per table and change type"""
+    summary = {}
+    for (table, change_type), count in change_log.groupby(["table", "change_type"]).size().items():
+        summary.setdefault(table, {})[change_type] = int(count)
+    return summary
+
+def create_change_log_sheet(wb, change_log):
+    """Create the Change_Log sheet listing catalog differences from the previous build"""
+    if change_log is None:
+        return
+    sheet = wb.create_sheet("Change_Log")
+    write_data_to_sheet(sheet, [CHANGE_LOG_COLUMNS] + change_log.values.tolist())
+
+def diff_previous_build(args, catalog, service_ids=None):
+    """Change log against --previous or the existing output, and the snapshot it was taken from
+    
+    Reading the previous workbook back is the slowest step of a plain rebuild, so the
+    diff only runs when --previous, --change-log-json or --skip-unchanged asks for it.
+    Returns (None, None) when there is no diff; a first build with --change-log-json
+    still writes the JSON, listing every record as added.
+    """
+    if not (args.previous or args.change_log_json or args.skip_unchanged):
+        return None, None
+    previous_source = args.previous or (args.output if os.path.exists(args.output) else None)
+    if previous_source is None:
+        if args.change_log_json:
+            empty = {table: catalog[table][:1] for table in CATALOG_TABLES}
+            write_change_log_json(diff_catalogs(empty, catalog), args.change_log_json, None)
+            print(f"No previous build at {args.output}, every record is listed as added in {args.change_log_json}")
+        return None, None
+    
+    # A --services/--business-unit build is compared with the same selection of the previous catalog
+    change_log = diff_catalogs(load_catalog(previous_source, service_ids, args.business_unit), catalog)
+    print(f"Catalog changes since {previous_source}: {summarize_changes(change_log) or 'none'}")
+    if args.change_log_json:
+        write_change_log_json(change_log, args.change_log_json, previous_source)
+    return change_log, previous_source
+
+def write_change_log_json(change_log, path, previous_source):
+    """Write catalog differences and their summary as JSON"""
+    with open(path, "w", encoding="utf-8") as json_file:
+        json.dump({
+            "previous": previous_source,
+            "generated": datetime.datetime.now(tz=datetime.timezone.utc).isoformat(),
+            "summary": summarize_changes(change_log),
+            "changes": change_log.to_dict("records"),
+        }, json_file, indent=2)
+
+def input_digest(args):
+    """sha256 of the non-catalog inputs the build reads: --metrics, the --events store and --incidents
+    
+    Directories are hashed file by file in name order; SQLite -shm index files
+    change on plain reads and are left out.
+    """
+    inputs = [("metrics", args.metrics), ("events", args.events),
+              ("incidents", args.incidents if args.impact_cost else None)]
+    digest = hashlib.sha256()
+    for name, path in inputs:
+        if not path:
+            continue
+        digest.update(f"{name}\0".encode("utf-8"))
+        if os.path.isdir(path):
+            files = sorted(os.path.relpath(os.path.join(root, file), path)
+                           for root, _, names in os.walk(path) for file in names if not file.endswith("-shm"))
+        else:
+            files = [""] if os.path.exists(path) else []
+        for file in files:
+            digest.update(f"{file}\0".encode("utf-8"))
+            with open(os.path.join(path, file) if file else path, "rb") as source:
+                for block in iter(lambda: source.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+def read_input_digest(path):
+    """The input digest stored in a built workbook, None for other catalog sources"""
+    if not zipfile.is_zipfile(path):
+        return None
+    with zipfile.ZipFile(path) as archive:
+        if "docProps/custom.xml" not in archive.namelist():
+            return None
+        properties = ElementTree.fromstring(archive.read("docProps/custom.xml"))
+    for prop in properties:
+        if prop.get("name") == INPUT_DIGEST_PROPERTY:
+            return "".join(prop.itertext())
+    return None
+
+def parse_threshold_grid(spec):
+    """Candidate thresholds from "start:stop:step" (stop included) or a comma-separated list"""
+    if ":" in spec:
+        start, stop, step = (float(part) for part in spec.split(":"))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(part) for part in spec.split(",") if part.strip()])
+
+def metric_matrices(metric_history):
+    """Service ids, timestamps and services x timestamps good and total event matrices"""
+    good = metric_history.pivot(index="service_id", columns="timestamp", values="good_events").fillna(0)
+    total = metric_history.pivot(index="service_id", columns="timestamp", values="total_events").fillna(0)
+    return good.index.tolist(), good.columns.to_numpy(), good.to_numpy(dtype=float), total.to_numpy(dtype=float)
+
+def window_rates(good, total, points):
+    """Success rate over a trailing window of points at every timestamp, NaN without events"""
+    good_sum = np.cumsum(np.pad(good, ((0, 0), (1, 0))), axis=1)
+    total_sum = np.cumsum(np.pad(total, ((0, 0), (1, 0))), axis=1)
+    start = np.maximum(np.arange(1, good.shape[1] + 1) - points, 0)
+    window_good = good_sum[:, 1:] - good_sum[:, start]
+    window_total = total_sum[:, 1:] - total_sum[:, start]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(window_total > 0, window_good / window_total * 100, np.nan)
+
+def backtest_thresholds(rates, thresholds, degraded, flap_points=BACKTEST_FLAP_POINTS):
+    """Replay services x timestamps rates against services x candidates thresholds in one vectorized pass"""
+    n_services, n = rates.shape
+    n_candidates = thresholds.shape[1]
+    t = np.arange(n)
+    services = np.arange(n_services)[:, None]
+    
+    # Rates and thresholds become exact integer ranks; NaN rates never alert, NaN thresholds rank above everything
+    rates = np.where(np.isnan(rates), BACKTEST_NEVER, rates)
+    levels = np.unique(np.concatenate([rates.ravel(), thresholds[~np.isnan(thresholds)], [BACKTEST_NEVER]]))
+    rates = np.searchsorted(levels, rates)
+    never = len(levels) - 1
+    stride = len(levels) + 1
+    
+    # Thresholds sorted per service and laid end to end, so one search places every interval
+    order = np.argsort(thresholds, axis=1, kind="stable")
+    sorted_ranks = (np.searchsorted(levels, np.take_along_axis(thresholds, order, axis=1)) + services * stride).ravel()
+    
+    def count(lower, upper, weights=1.0):
+        """Weight of intervals (lower, upper] holding each threshold, via a difference array over sorted candidates"""
+        valid = lower < upper
+        rows = np.broadcast_to(services, lower.shape)[valid]
+        first = np.searchsorted(sorted_ranks, lower[valid] + rows * stride, side="right") - rows * n_candidates
+        last = np.searchsorted(sorted_ranks, upper[valid] + rows * stride, side="right") - rows * n_candidates
+        weights = np.broadcast_to(np.asarray(weights, dtype=float), lower.shape)[valid]
+        size = n_services * (n_candidates + 1)
+        diff = (np.bincount(rows * (n_candidates + 1) + first, weights, size)
+                - np.bincount(rows * (n_candidates + 1) + last, weights, size))
+        counts = np.cumsum(diff.reshape(n_services, n_candidates + 1), axis=1)[:, :n_candidates]
+        result = np.empty_like(counts)
+        np.put_along_axis(result, order, counts, axis=1)
+        return result
+    
+    # An alert is active while the windowed rate is below the threshold, so every metric counts the
+    # thresholds inside per-evaluation intervals; the services x candidates x timestamps cube is never built
+    previous = np.concatenate([np.full((n_services, 1), never), rates[:, :-1]], axis=1)
+    at_never = np.full(rates.shape, never)
+    in_alert = count(rates, at_never)
+    false_alert = count(rates, at_never, ~degraded)
+    alerts = count(rates, previous)
+    
+    # Flapping: the alert does not hold for flap_points evaluations (shorter tails at the end of history do)
+    window_max = rates.copy()
+    for shift in range(1, flap_points):
+        window_max[:, :-shift] = np.maximum(window_max[:, :-shift], rates[:, shift:])
+    flapping = count(rates, np.minimum(previous, window_max))
+    
+    # Time to detect: within a degradation episode the first alert comes at offset j once the
+    # threshold exceeds the running minimum rate up to j, so offset j owns (min[j], min[j-1]]
+    starts = degraded.copy()
+    starts[:, 1:] &= ~degraded[:, :-1]
+    episode = np.cumsum(starts.ravel()).reshape(starts.shape)
+    shift = episode * stride
+    running_min = np.minimum.accumulate((rates - shift).ravel()).reshape(rates.shape) + shift
+    episode_start = np.maximum.accumulate(np.where(starts, t, 0), axis=1)
+    previous_min = np.concatenate([np.full((n_services, 1), never), running_min[:, :-1]], axis=1)
+    previous_min = np.where(starts, never, previous_min)
+    running_min = np.where(degraded, running_min, never)
+    detected = count(running_min, previous_min)
+    delay = count(running_min, previous_min, np.where(degraded, t - episode_start, 0))
+    
+    healthy = np.maximum((~degraded).sum(axis=1), 1)[:, None]
+    return {
+        "alerts": np.rint(alerts).astype(np.int64),
+        "flapping_alerts": np.rint(flapping).astype(np.int64),
+        "time_in_alert": in_alert / n,
+        "false_alert_time": false_alert / healthy,
+        "degradations": np.broadcast_to(starts.sum(axis=1)[:, None], detected.shape),
+        "detected": np.rint(detected).astype(np.int64),
+        "mean_delay_points": np.where(detected > 0, delay / np.maximum(detected, 1), np.nan),
+    }
+
+def backtest_alerting(metric_history, catalog, candidate_thresholds, candidate_windows):
+    """Backtest current and candidate alert thresholds/windows for every catalog service with history"""
+    slo_header = catalog["SLO_Configurations"][0]
+    slos = {}
+    for row in catalog["SLO_Configurations"][1:]:
+        slos.setdefault(row[0], dict(zip(slo_header, row)))
+    
+    def slo_value(service_id, field):
+        value = slos.get(service_id, {}).get(field)
+        return float(value) if value not in ("", None) else np.nan
+    
+    service_ids, timestamps, good, total = metric_matrices(metric_history)
+    keep = [i for i, service_id in enumerate(service_ids) if not np.isnan(slo_value(service_id, "sloTarget"))]
+    service_ids = [service_ids[i] for i in keep]
+    good, total = good[keep], total[keep]
+    if not service_ids:
+        return pd.DataFrame(columns=BACKTEST_COLUMNS)
+    step = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 60.0
+    
+    # Window lengths in evaluation points; the current thresholds are evaluated on the shortest window
+    windows = sorted({max(1, int(round(parse_time_window(window) / step))) for window in candidate_windows})
+    
+    # Ground truth: the SLO target is missed over the longest candidate window
+    targets = np.array([slo_value(service_id, "sloTarget") for service_id in service_ids])
+    with np.errstate(invalid="ignore"):
+        degraded = window_rates(good, total, windows[-1]) < targets[:, None]
+    current = np.array([[slo_value(service_id, "alertingThreshold"), slo_value(service_id, "pageThreshold")]
+                        for service_id in service_ids])
+    current_results = backtest_thresholds(window_rates(good, total, windows[0]), current, degraded)
+    
+    grid = np.broadcast_to(candidate_thresholds, (len(service_ids), len(candidate_thresholds)))
+    # The longest window defines a degradation, the shorter ones compete to detect it early and quietly
+    candidate_points = windows[:-1] or windows
+    grid_results = [backtest_thresholds(window_rates(good, total, points), grid, degraded) for points in candidate_points]
+    merged = {key: np.concatenate([result[key] for result in grid_results], axis=1) for key in grid_results[0]}
+    
+    # Recommended: best share of degradations detected minus share of healthy time in alert,
+    # then the fewest flapping alerts, fewest alerts and fastest detection
+    recall = merged["detected"] / np.maximum(merged["degradations"], 1)
+    score = np.round(recall - merged["false_alert_time"], 9)
+    delay = np.nan_to_num(merged["mean_delay_points"], nan=np.inf)
+    rows = np.repeat(np.arange(len(service_ids))[:, None], delay.shape[1], axis=1)
+    order = np.lexsort((delay.ravel(), merged["alerts"].ravel(), merged["flapping_alerts"].ravel(),
+                        -score.ravel(), rows.ravel()))
+    best = order[np.searchsorted(rows.ravel()[order], np.arange(len(service_ids)))] % delay.shape[1]
+    
+    records = []
+    for i, service_id in enumerate(service_ids):
+        configurations = [
+            ("current alert", current[i, 0], windows[0], current_results, 0),
+            ("current page", current[i, 1], windows[0], current_results, 1),
+            ("recommended alert", grid[i, best[i] % grid.shape[1]], candidate_points[best[i] // grid.shape[1]], merged,
+             best[i]),
+        ]
+        for label, threshold, points, results, column in configurations:
+            mean_delay = results["mean_delay_points"][i, column]
+            records.append([
+                service_id, label, None if np.isnan(threshold) else float(threshold), f"{int(points * step // 60)}m",
+                int(results["alerts"][i, column]), int(results["flapping_alerts"][i, column]),
+                round(float(results["time_in_alert"][i, column]) * 100, 2),
+                round(float(results["false_alert_time"][i, column]) * 100, 2),
+                int(results["degradations"][i, column]), int(results["detected"][i, column]),
+                None if np.isnan(mean_delay) else round(float(mean_delay) * step / 60, 1),
+            ])
+    return pd.DataFrame(records, columns=BACKTEST_COLUMNS)
+
+def create_backtest_sheet(wb, backtest):
+    """Create the Threshold_Backtest sheet comparing current and recommended alert thresholds"""
+    if backtest is None:
+        return
+    sheet = wb.create_sheet("Threshold_Backtest")
+    write_data_to_sheet(sheet, [BACKTEST_COLUMNS] + backtest.astype(object).where(backtest.notna(), None).values.tolist())
+
+def recommend_slos(metric_history, catalog, windows):
+    """Recommend SLO targets and thresholds per service from rolling-window achieved reliability"""
+    slo_header = catalog["SLO_Configurations"][0]
+    slos = {}
+    for row in catalog["SLO_Configurations"][1:]:
+        slos.setdefault(row[0], dict(zip(slo_header, row)))
+    
+    def slo_value(service_id, field):
+        value = slos.get(service_id, {}).get(field)
+        return float(value) if value not in ("", None) else np.nan
+    
+    service_ids, timestamps, good, total = metric_matrices(metric_history)
+    keep = [i for i, service_id in enumerate(service_ids) if service_id in slos]
+    service_ids = [service_ids[i] for i in keep]
+    good, total = good[keep], total[keep]
+    columns = (["service_id", "sloTarget", "recommended_sloTarget", "alertingThreshold", "recommended_alertingThreshold",
+                "pageThreshold", "recommended_pageThreshold", "budget_used_pct", "recommended_budget_used_pct"]
+               + [f"{window}_p{q}" for window in windows for q in RECOMMEND_PERCENTILES] + ["basis"])
+    if not service_ids:
+        return pd.DataFrame(columns=columns)
+    step = float(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 60.0
+    
+    # Percentiles of the trailing-window success rate for every service at once, one window at a time;
+    # only complete windows count unless the history is shorter than the window
+    n = good.shape[1]
+    distributions = []
+    for window in windows:
+        points = max(1, int(round(parse_time_window(window) / step)))
+        rates = window_rates(good, total, points)
+        if points <= n:
+            rates[:, :points - 1] = np.nan
+        else:
+            rates = rates[:, -1:]
+        with np.errstate(all="ignore"):
+            distributions.append(np.nanpercentile(rates, RECOMMEND_PERCENTILES, axis=1).T)
+    distributions = np.stack(distributions, axis=1)  # services x windows x percentiles
+    
+    # Each service is judged on its own SLO timeWindow when it is analyzed, otherwise the longest window
+    window_seconds = [parse_time_window(window) for window in windows]
+    longest = int(np.argmax(window_seconds))
+    basis = np.array([
+        window_seconds.index(parse_time_window(slos[sid].get("timeWindow")))
+        if parse_time_window(slos[sid].get("timeWindow")) in window_seconds else longest
+        for sid in service_ids
+    ])
+    achieved = distributions[np.arange(len(service_ids)), basis]
+    floor_rate, median_rate = achieved[:, RECOMMEND_PERCENTILES.index(RECOMMEND_PERCENTILE)], achieved[:, -1]
+    
+    # Highest ladder target at or below the rate met in (100 - RECOMMEND_PERCENTILE)% of windows,
+    # the whole percent below it for services under the ladder
+    ladder = np.array(SLO_TARGET_LADDER)
+    position = np.searchsorted(ladder, np.nan_to_num(floor_rate, nan=-1.0), side="right") - 1
+    recommended = np.where(position >= 0, ladder[np.maximum(position, 0)], np.floor(floor_rate))
+    budget = 100 - recommended
+    current = np.array([slo_value(sid, "sloTarget") for sid in service_ids])
+    with np.errstate(all="ignore"):
+        budget_used = (100 - median_rate) / (100 - current) * 100
+        recommended_used = (100 - median_rate) / budget * 100
+    
+    def rounded(values, digits=2):
+        return [None if np.isnan(value) else round(float(value), digits) for value in values]
+    
+    records = {
+        "service_id": service_ids,
+        "sloTarget": rounded(current),
+        "recommended_sloTarget": rounded(recommended),
+        "alertingThreshold": rounded([slo_value(sid, "alertingThreshold") for sid in service_ids]),
+        "recommended_alertingThreshold": rounded(recommended - ALERT_BUDGET_FRACTION * budget, 3),
+        "pageThreshold": rounded([slo_value(sid, "pageThreshold") for sid in service_ids]),
+        "recommended_pageThreshold": rounded(recommended - PAGE_BUDGET_FRACTION * budget, 3),
+        "budget_used_pct": rounded(budget_used, 1),
+        "recommended_budget_used_pct": rounded(recommended_used, 1),
+    }
+    for w, window in enumerate(windows):
+        for q_idx, q in enumerate(RECOMMEND_PERCENTILES):
+            records[f"{window}_p{q}"] = rounded(distributions[:, w, q_idx], 3)
+    records["basis"] = [f"p{RECOMMEND_PERCENTILE} of rolling {windows[b]} success rate" for b in basis]
+    return pd.DataFrame(records, columns=columns)
+
+def create_slo_recommendations_sheet(wb, slo_recommendations):
+    """Create the SLO_Recommendations sheet with recommended targets and thresholds beside the current ones"""
+    if slo_recommendations is None:
+        return
+    sheet = wb.create_sheet("SLO_Recommendations")
+    rows = slo_recommendations.astype(object).where(slo_recommendations.notna(), None).values.tolist()
+    write_data_to_sheet(sheet, [list(slo_recommendations.columns)] + rows)
+
+def parse_impact_rates(impact_rows):
+    """Numeric stakeholder rates and dollar amounts parsed from the Impact_Assessments text columns"""
+    frame = pd.DataFrame(impact_rows[1:], columns=impact_rows[0], dtype=object)
+    raw = frame[["service_id", "stakeholderCount", "financialImpact"]].fillna("").astype(str)
+    digest = hashlib.sha256(raw.to_csv(index=False).encode("utf-8")).hexdigest()
+    if digest in _impact_rates:
+        return _impact_rates[digest]
+    
+    # "850 daily" -> 850 per day; "50 processors" is a headcount with no rate
+    counts = raw["stakeholderCount"].str.extract(r"^\s*([\d,]+(?:\.\d+)?)\s*(\w*)", expand=True)
+    count = pd.to_numeric(counts[0].str.replace(",", "", regex=False), errors="coerce")
+    period_days = counts[1].str.lower().map(STAKEHOLDER_PERIOD_DAYS)
+    
+    # "$380000 average per delayed closing" -> 380000 per "delayed closing"
+    dollars = raw["financialImpact"].str.extract(r"\$\s*([\d,]+(?:\.\d+)?)\s*([kKmMbB]?)\b\s*(.*)$", expand=True)
+    amount = pd.to_numeric(dollars[0].str.replace(",", "", regex=False), errors="coerce")
+    amount = amount * dollars[1].str.lower().map(DOLLAR_MULTIPLIERS)
+    unit = dollars[2].str.extract(r"per\s+(.+)$", expand=False).fillna(dollars[2]).str.strip()
+    
+    parsed = pd.DataFrame({
+        "service_id": raw["service_id"],
+        "stakeholders_per_day": (count / period_days).astype(float),
+        "dollars_per_unit": amount.astype(float),
+        "dollar_unit": unit.where(amount.notna()),
+    })
+    
+    # One rate row per service: daily stakeholders add up, the first dollar amount applies
+    rates = parsed.groupby("service_id", sort=False).agg(
+        daily_stakeholders=("stakeholders_per_day", lambda values: values.sum(min_count=1)),
+        dollars_per_unit=("dollars_per_unit", "first"),
+        dollar_unit=("dollar_unit", "first"),
+    ).reset_index()
+    # Watch rebuilds reuse the last parse while Impact_Assessments is unchanged
+    _impact_rates.clear()
+    _impact_rates[digest] = rates
+    return rates
+
+def load_incidents(incidents_path, reference_time):
+    """Incidents with start times resolved against reference_time and hours open (unknown once resolved)"""
+    if not incidents_path or not os.path.exists(incidents_path):
+        return None
+    incidents = pd.read_csv(incidents_path, comment="#", dtype=str, keep_default_na=False)
+    
+    # "started" is either relative ("2h ago") or an absolute timestamp
+    relative = incidents["started"].str.extract(r"^\s*(\d+\s*[mhdw])\s+ago\s*$", expand=False)
+    age_seconds = relative.map(parse_time_window, na_action="ignore").astype(float)
+    absolute = pd.to_datetime(incidents["started"].where(relative.isna()), errors="coerce", utc=True).dt.tz_localize(None)
+    incidents["started_at"] = absolute.fillna(reference_time - pd.to_timedelta(age_seconds, unit="s"))
+    
+    # Incidents still open have lasted until the reference time; resolved ones carry no end time
+    open_hours = (reference_time - incidents["started_at"]).dt.total_seconds() / 3600
+    incidents["hours"] = open_hours.where(incidents["status"].str.lower() != "resolved")
+    incidents["impact_share"] = incidents["severity"].map(SEVERITY_IMPACT_SHARE).fillna(0.0)
+    return incidents
+
+def compute_impact_cost(catalog, metric_history, incidents_path):
+    """Customers affected and dollars at risk per service, product line and period"""
+    rates = parse_impact_rates(catalog["Impact_Assessments"])
+    services = pd.DataFrame(catalog["Services"][1:], columns=catalog["Services"][0])[["service_id", "businessUnit"]]
+    services = services.merge(rates, on="service_id", how="left")
+    
+    # SLI failures per service and period over the whole metric history
+    if metric_history is not None:
+        history = metric_history[metric_history["service_id"].isin(services["service_id"])].copy()
+        times = np.sort(metric_history["timestamp"].unique())
+        step = float(np.median(np.diff(times))) if len(times) > 1 else 60.0
+        reference_time = pd.to_datetime(times[-1], unit="s") if len(times) else pd.Timestamp.now()
+        history["period"] = pd.to_datetime(history["timestamp"], unit="s").dt.floor(IMPACT_PERIOD)
+        failures = history.groupby(["service_id", "period"]).agg(
+            good_events=("good_events", "sum"), total_events=("total_events", "sum"), points=("timestamp", "size"),
+        ).reset_index()
+        failures["failed_events"] = failures["total_events"] - failures["good_events"]
+        failures["observed_days"] = failures["points"] * step / 86400
+    else:
+        reference_time = pd.Timestamp.now()
+        failures = pd.DataFrame(columns=["service_id", "period", "failed_events", "total_events", "observed_days"])
+    
+    # Incident counts and open hours per service and period
+    incidents = load_incidents(incidents_path, reference_time)
+    if incidents is not None:
+        incidents = incidents[incidents["service_id"].isin(services["service_id"])].copy()
+        incidents["period"] = incidents["started_at"].dt.floor(IMPACT_PERIOD)
+        incidents["weighted_hours"] = incidents["hours"] * incidents["impact_share"]
+        outages = incidents.groupby(["service_id", "period"]).agg(
+            incidents=("incident_id", "size"),
+            incident_hours=("hours", lambda values: values.sum(min_count=1)),
+            weighted_hours=("weighted_hours", lambda values: values.sum(min_count=1)),
+        ).reset_index()
+    else:
+        outages = pd.DataFrame(columns=["service_id", "period", "incidents", "incident_hours", "weighted_hours"])
+    
+    costs = failures.merge(outages, on=["service_id", "period"], how="outer").merge(services, on="service_id")
+    for column in ["failed_events", "total_events", "incidents", "observed_days"]:
+        costs[column] = pd.to_numeric(costs[column], errors="coerce").fillna(0)
+    for column in ["incident_hours", "weighted_hours", "daily_stakeholders", "dollars_per_unit"]:
+        costs[column] = pd.to_numeric(costs[column], errors="coerce")
+    
+    # Failed share of the observed period's stakeholders, and stakeholders hit while incidents were open
+    failure_ratio = costs["failed_events"] / costs["total_events"].where(costs["total_events"] > 0)
+    costs["customers_affected_sli"] = costs["daily_stakeholders"] * costs["observed_days"] * failure_ratio
+    costs["customers_affected_incidents"] = costs["daily_stakeholders"] * costs["weighted_hours"] / 24
+    
+    # Incidents usually show up as SLI failures too, so dollars follow the larger estimate rather than the sum
+    affected = costs[["customers_affected_sli", "customers_affected_incidents"]].max(axis=1, skipna=True)
+    costs["dollars_at_risk"] = affected * costs["dollars_per_unit"]
+    costs["level"] = "service"
+    costs = costs.sort_values(["service_id", "period"], kind="stable")
+    
+    # Product line and overall totals per period
+    sums = ["failed_events", "total_events", "incidents", "incident_hours", "customers_affected_sli",
+            "customers_affected_incidents", "dollars_at_risk"]
+    product_lines = costs.groupby(["businessUnit", "period"])[sums].sum(min_count=1).reset_index()
+    product_lines["level"] = "product line"
+    totals = costs.groupby("period")[sums].sum(min_count=1).reset_index()
+    totals["level"] = "total"
+    
+    report = pd.concat([costs, product_lines, totals], ignore_index=True).reindex(columns=IMPACT_COST_COLUMNS)
+    report["period"] = pd.to_datetime(report["period"]).dt.strftime("%Y-%m-%d")
+    for column in ["incident_hours", "daily_stakeholders", "customers_affected_sli", "customers_affected_incidents"]:
+        report[column] = report[column].astype(float).round(1)
+    report["dollars_at_risk"] = report["dollars_at_risk"].astype(float).round(0)
+    return report
+
+def create_impact_cost_sheet(wb, impact_cost):
+    """Create the Impact_Cost sheet with customers affected and dollars at risk"""
+    if impact_cost is None:
+        return
+    sheet = wb.create_sheet("Impact_Cost")
+    rows = impact_cost.astype(object).where(impact_cost.notna(), None).values.tolist()
+    write_data_to_sheet(sheet, [IMPACT_COST_COLUMNS] + rows)
+
+class FormulaError(Exception):
+    """An Excel error value (#N/A, #REF!, ...) produced while evaluating a formula"""
+
+class UnsupportedFormula(Exception):
+    """A formula outside the subset FormulaEvaluator implements; the cell keeps no cached value"""
+
+def excel_text(value, number_format):
+    """TEXT(value, number_format) for the 0.0# style formats the builder uses"""
+    match = re.fullmatch(r"0(?:\.(0*)(#*))?", number_format)
+    if match is None:
+        raise UnsupportedFormula(f"TEXT format {number_format!r}")
+    if isinstance(value, str):
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    required, optional = match.group(1) or "", match.group(2) or ""
+    text = f"{float(value or 0):.{len(required) + len(optional)}f}"
+    if optional:
+        whole, _, fraction = text.partition(".")
+        fraction = fraction[:len(required)] + fraction[len(required):].rstrip("0")
+        text = whole + ("." + fraction if fraction else "")
+    return text
+
+def excel_string(value):
+    """Text form of a value in & concatenation"""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        value = to_excel(value)
+    if isinstance(value, numbers.Real):
+        return f"{value:.15g}"
+    return str(value)
+
+def excel_equal(left, right):
+    """The = operator: text compares case-insensitively, an empty cell equals "" and 0"""
+    if left is None:
+        left = "" if isinstance(right, str) or right is None else 0
+    if right is None:
+        right = "" if isinstance(left, str) else 0
+    if isinstance(left, str) and isinstance(right, str):
+        return left.casefold() == right.casefold()
+    if isinstance(left, bool) or isinstance(right, bool):
+        return left is right
+    if isinstance(left, numbers.Real) and isinstance(right, numbers.Real):
+        return left == right
+    return False
+
+def match_key(value):
+    """Key of a value in a MATCH lookup table; text matches case-insensitively"""
+    if isinstance(value, str):
+        return ("text", value.casefold())
+    if isinstance(value, bool):
+        return ("bool", value)
+    return ("number", float(value))
+
+def parse_formula(formula):
+    """Parse the builder's formula subset into nested tuples"""
+    tokens = []
+    position = 0
+    while position < len(formula):
+        match = FORMULA_TOKEN.match(formula, position)
+        if match is None:
+            raise UnsupportedFormula(f"Unsupported formula syntax: {formula}")
+        position = match.end()
+        if match.lastgroup != "space":
+            tokens.append((match.lastgroup, match.group(match.lastgroup)))
+    tokens.append(("end", None))
+    position = 0
+    
+    def take(kind, text=None):
+        nonlocal position
+        token = tokens[position]
+        if token[0] != kind or (text is not None and token[1] != text):
+            raise UnsupportedFormula(f"Unsupported formula syntax: {formula}")
+        position += 1
+        return token[1]
+    
+    def expression():
+        # Comparison binds loosest, then &, as in Excel
+        node = concatenation()
+        while tokens[position] == ("operator", "="):
+            take("operator")
+            node = ("=", node, concatenation())
+        return node
+    
+    def concatenation():
+        node = operand()
+        while tokens[position] == ("operator", "&"):
+            take("operator")
+            node = ("&", node, operand())
+        return node
+    
+    def operand():
+        kind, text = tokens[position]
+        if kind == "string":
+            take(kind)
+            return ("value", text[1:-1].replace('""', '"'))
+        if kind == "number":
+            take(kind)
+            return ("value", float(text) if "." in text else int(text))
+        if kind == "function":
+            take(kind)
+            arguments = []
+            if tokens[position] != ("operator", ")"):
+                arguments.append(expression())
+                while tokens[position] == ("operator", ","):
+                    take("operator")
+                    arguments.append(expression())
+            take("operator", ")")
+            return ("call", text[:-1].upper(), arguments)
+        if kind == "reference":
+            take(kind)
+            return ("reference",) + parse_reference(text)
+        take("operator", "(")
+        node = expression()
+        take("operator", ")")
+        return node
+    
+    node = expression()
+    take("end")
+    return node
+
+def parse_reference(text):
+    """(sheet, first_col, first_row, last_col, last_row) of an A1 reference; whole columns have no rows"""
+    sheet = None
+    if "!" in text:
+        sheet, text = text.rsplit("!", 1)
+        sheet = sheet[1:-1].replace("''", "'") if sheet.startswith("'") else sheet
+    corners = []
+    for corner in text.replace("$", "").split(":"):
+        letters, digits = re.fullmatch(r"([A-Z]+)(\d*)", corner).groups()
+        corners.append((column_index_from_string(letters), int(digits) if digits else None))
+    (first_col, first_row), (last_col, last_row) = corners[0], corners[-1]
+    return sheet, first_col, first_row, last_col, last_row
+
+class FormulaEvaluator:
+    """Evaluates the builder's lookup formulas against the in-memory workbook
+    
+    Covers what the builder writes: cell and column references, INDEX, exact
+    MATCH, IF, IFERROR, TEXT, NA and the & and = operators; anything else
+    raises UnsupportedFormula. MATCH builds one lookup table per referenced
+    column, so each lookup is a dict access.
+    """
+    
+    def __init__(self, wb):
+        self.wb = wb
+        self.results = {}
+        self.lookups = {}
+        self.bounds = {}  # max_row/max_column scan every cell, so they are read once per sheet
+    
+    def cell(self, sheet, row, col):
+        """Value of a cell, evaluating it first when it holds a formula"""
+        key = (sheet, row, col)
+        if key in self.results:
+            result = self.results[key]
+            if isinstance(result, FormulaError):
+                raise result
+            return result
+        ws = self.wb[sheet]
+        if sheet not in self.bounds:
+            self.bounds[sheet] = (ws.max_row, ws.max_column)
+        max_row, max_col = self.bounds[sheet]
+        if row > max_row or col > max_col:
+            return None
+        value = ws.cell(row=row, column=col).value
+        if not (isinstance(value, str) and value.startswith("=")):
+            return value
+        
+        # A circular reference reads as an error instead of recursing forever
+        self.results[key] = FormulaError("#REF!")
+        try:
+            self.results[key] = self.evaluate(parse_formula(value[1:]), sheet)
+        except FormulaError as error:
+            self.results[key] = error
+        except UnsupportedFormula:
+            del self.results[key]
+            raise
+        return self.cell(sheet, row, col)
+    
+    def column_range(self, node, sheet):
+        """(sheet, col, first_row, last_row) of a single-column INDEX/MATCH range argument"""
+        if node[0] != "reference" or node[2] != node[4]:
+            raise UnsupportedFormula("INDEX and MATCH need a single-column range")
+        ref_sheet, col, first_row, _, last_row = node[1:]
+        return ref_sheet or sheet, col, first_row or 1, last_row or EXCEL_MAX_ROW
+    
+    def lookup_table(self, sheet, col, first_row, last_row):
+        """Position of the first occurrence of each value in a column range, for exact MATCH"""
+        key = (sheet, col, first_row, last_row)
+        if key not in self.lookups:
+            ws = self.wb[sheet]
+            table = {}
+            for offset, (value,) in enumerate(ws.iter_rows(min_row=first_row, max_row=min(last_row, ws.max_row),
+                                                          min_col=col, max_col=col, values_only=True)):
+                if isinstance(value, str) and value.startswith("="):
+                    with contextlib.suppress(FormulaError):
+                        value = self.cell(sheet, first_row + offset, col)
+                if value not in ("", None):
+                    table.setdefault(match_key(value), offset + 1)
+            self.lookups[key] = table
+        return self.lookups[key]
+    
+    def evaluate(self, node, sheet):
+        """Value of a parsed formula node on the given sheet; Excel errors raise FormulaError"""
+        kind = node[0]
+        if kind == "value":
+            return node[1]
+        if kind == "reference":
+            ref_sheet, first_col, first_row, last_col, last_row = node[1:]
+            if first_row is None or (first_col, first_row) != (last_col, last_row):
+                raise UnsupportedFormula("Ranges are only supported as INDEX/MATCH arguments")
+            return self.cell(ref_sheet or sheet, first_row, first_col)
+        if kind == "&":
+            return excel_string(self.evaluate(node[1], sheet)) + excel_string(self.evaluate(node[2], sheet))
+        if kind == "=":
+            return excel_equal(self.evaluate(node[1], sheet), self.evaluate(node[2], sheet))
+        
+        name, arguments = node[1], node[2]
+        if name == "IFERROR":
+            try:
+                return self.evaluate(arguments[0], sheet)
+            except FormulaError:
+                return self.evaluate(arguments[1], sheet)
+        if name == "IF":
+            condition = self.evaluate(arguments[0], sheet)
+            if isinstance(condition, str):
+                raise FormulaError("#VALUE!")
+            if condition:
+                return self.evaluate(arguments[1], sheet)
+            return self.evaluate(arguments[2], sheet) if len(arguments) > 2 else False
+        if name == "NA":
+            raise FormulaError("#N/A")
+        if name == "TEXT":
+            return excel_text(self.evaluate(arguments[0], sheet), excel_string(self.evaluate(arguments[1], sheet)))
+        if name == "INDEX":
+            ref_sheet, col, first_row, last_row = self.column_range(arguments[0], sheet)
+            index = self.evaluate(arguments[1], sheet)
+            if not isinstance(index, numbers.Real) or isinstance(index, bool) or not 1 <= index <= last_row - first_row + 1:
+                raise FormulaError("#REF!")
+            return self.cell(ref_sheet, first_row + int(index) - 1, col)
+        if name == "MATCH":
+            if len(arguments) < 3 or self.evaluate(arguments[2], sheet) != 0:
+                raise UnsupportedFormula("Only exact MATCH is supported")
+            value = self.evaluate(arguments[0], sheet)
+            if value in ("", None):
+                raise FormulaError("#N/A")
+            found = self.lookup_table(*self.column_range(arguments[1], sheet)).get(match_key(value))
+            if found is None:
+                raise FormulaError("#N/A")
+            return found
+        raise UnsupportedFormula(f"Unsupported function {name}")
+
+def evaluate_workbook_formulas(wb):
+    """Evaluated value of every supported formula cell, as {sheet title: {coordinate: value}}"""
+    evaluator = FormulaEvaluator(wb)
+    cached = {}
+    for ws in wb.worksheets:
+        values = cached.setdefault(ws.title, {})
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.data_type != "f" or not isinstance(cell.value, str):
+                    continue
+                try:
+                    value = evaluator.cell(ws.title, cell.row, cell.column)
+                except FormulaError as error:
+                    value = error
+                except UnsupportedFormula:
+                    continue
+                # A formula returning an empty cell shows 0, as in Excel
+                values[cell.coordinate] = 0 if value is None else value
+    return cached
+
+def write_cached_values(parts, wb, cached):
+    """Fill the empty value openpyxl writes after each formula with its evaluated value"""
+    def cached_cell(match):
+        coordinate, attrs, formula = match.groups()
+        if coordinate not in values:
+            return match.group(0)
+        value = values[coordinate]
+        if isinstance(value, FormulaError):
+            value_type, text = ' t="e"', str(value)
+        elif isinstance(value, bool):
+            value_type, text = ' t="b"', str(int(value))
+        elif isinstance(value, (datetime.datetime, datetime.date)):
+            value_type, text = "", repr(float(to_excel(value)))
+        elif isinstance(value, numbers.Real):
+            value_type, text = "", repr(value.item() if isinstance(value, np.generic) else value)
+        else:
+            value_type, text = ' t="str"', html.escape(str(value), quote=False)
+        return f'<c r="{coordinate}"{attrs}{value_type}><f>{formula}</f><v>{text}</v></c>'
+    
+    # openpyxl numbers worksheet parts in workbook order
+    for index, ws in enumerate(wb.worksheets, 1):
+        name = f"xl/worksheets/sheet{index}.xml"
+        values = cached.get(ws.title)
+        if values and name in parts:
+            parts[name] = FORMULA_CELL.sub(cached_cell, parts[name].decode("utf-8")).encode("utf-8")
+
+def save_workbook(wb, output_path, compression_level=DEFAULT_COMPRESSION_LEVEL, modified=None):
+    """Save workbook with a shared strings table and the given zip compression level
+
+    openpyxl writes every text cell as an inline string, so repeated values
+    (business units, owners, "Not Defined" fallbacks) are stored once per cell.
+    The workbook is rendered uncompressed in memory, repeated strings are
+    interned into xl/sharedStrings.xml, and the parts are re-packed at the
+    requested level. Formula cells get cached values evaluated in Python, so
+    readers that do not recalculate (openpyxl data_only, pandas) see results;
+    Excel still recalculates on open. The modified property (default now, UTC)
+    also dates the zip entries, so a pinned time gives the same bytes for the
+    same content. Returns the per-part size report.
+    """
+    wb.properties.modified = modified or datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    cached_values = evaluate_workbook_formulas(wb)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+        ExcelWriter(wb, archive).write_data()
+    
+    parts = {}
+    with zipfile.ZipFile(buffer) as archive:
+        for name in archive.namelist():
+            parts[name] = archive.read(name)
+    
+    write_cached_values(parts, wb, cached_values)
+    if SHARED_STRINGS_PART not in parts:
+        intern_shared_strings(parts)
+    
+    if compression_level == 0:
+        compression = zipfile.ZIP_STORED
+    else:
+        compression = zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(output_path, "w", compression, allowZip64=True,
+                         compresslevel=compression_level or None) as archive:
+        date_time = max(wb.properties.modified, ZIP_EPOCH).timetuple()[:6]
+        for name, data in parts.items():
+            archive.writestr(zipfile.ZipInfo(name, date_time), data, compression, compression_level or None)
+        report = [(info.filename, info.file_size, info.compress_size) for info in archive.infolist()]
+    
+    return report
+
+def intern_shared_strings(parts):
+    """Move inline string cells of every worksheet part into a shared strings table"""
+    string_index = {}
+    total_refs = 0
+    
+    def intern_cell(match):
+        nonlocal total_refs
+        attrs_before, attrs_after, text = match.groups()
+        index = string_index.setdefault(text, len(string_index))
+        total_refs += 1
+        return f'<c {attrs_before}t="s"{attrs_after}><v>{index}</v></c>'
+    
+    for name in sorted(parts):
+        if WORKSHEET_PART.match(name):
+            xml = parts[name].decode("utf-8")
+            parts[name] = INLINE_STRING_CELL.sub(intern_cell, xml).encode("utf-8")
+    
+    if not string_index:
+        return
+    
+    # Text is kept in its escaped XML form, so it can be copied verbatim
+    items = "".join(f'<si><t xml:space="preserve">{text}</t></si>' for text in string_index)
+    parts[SHARED_STRINGS_PART] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{total_refs}" uniqueCount="{len(string_index)}">{items}</sst>'
+    ).encode("utf-8")
+    
+    content_types = parts["[Content_Types].xml"].decode("utf-8")
+    override = f'<Override PartName="/{SHARED_STRINGS_PART}" ContentType="{SHARED_STRINGS_CONTENT_TYPE}" />'
+    parts["[Content_Types].xml"] = content_types.replace("</Types>", override + "</Types>").encode("utf-8")
+    
+    rels_name = "xl/_rels/workbook.xml.rels"
+    rels = parts[rels_name].decode("utf-8")
+    next_id = max([int(n) for n in re.findall(r'Id="rId(\d+)"', rels)] or [0]) + 1
+    relationship = f'<Relationship Type="{SHARED_STRINGS_REL_TYPE}" Target="sharedStrings.xml" Id="rId{next_id}" />'
+    parts[rels_name] = rels.replace("</Relationships>", relationship + "</Relationships>").encode("utf-8")
+
+def print_part_sizes(report):
+    """Print per-part byte sizes of a saved workbook"""
+    print(f"\n{'Part':<40} {'Bytes':>10} {'Stored':>10}")
+    for name, raw_size, stored_size in sorted(report, key=lambda part: part[2], reverse=True):
+        print(f"{name:<40} {raw_size:>10,} {stored_size:>10,}")
+    total_raw = sum(part[1] for part in report)
+    total_stored = sum(part[2] for part in report)
+    print(f"{'Total':<40} {total_raw:>10,} {total_stored:>10,}")
+
+def snapshot_time(sources):
+    """UTC modification time of the newest file behind the sources, None when none exist
+    
+    Directories stand for their files and SQLite databases include their -wal
+    file; -shm index files change on plain reads and are left out.
+    """
+    paths = []
+    for source in sources:
+        if source and os.path.isdir(source):
+            paths += [os.path.join(source, name) for name in os.listdir(source) if not name.endswith("-shm")]
+        elif source:
+            paths += [source, f"{source}-wal"]
+    stamps = [stamp[0] for stamp in map(source_stamp, paths) if stamp]
+    if not stamps:
+        return None
+    return datetime.datetime.fromtimestamp(max(stamps) / 1e9, tz=datetime.timezone.utc).replace(tzinfo=None)
+
+def source_stamp(path):
+    """Modification time and size of a source file, None while it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def build_outputs(args, catalog, metric_history, change_log=None, pool=None):
+    """Evaluate the optional stages, then save the workbook and the --site pages
+    
+    Shared by one-shot and --watch builds so both honor the same options.
+    Returns the stage results by name, None for stages that did not run.
+    """
+    stages = {"sli_results": None, "backtest": None, "slo_recommendations": None, "impact_cost": None}
+    if pool is not None:
+        started = time.perf_counter()
+        stages["sli_results"] = sli_results = evaluate_slis(catalog, pool, args.sli_workers)
+        print(f"Evaluated {len(sli_results)} SLIs against {args.events} in {time.perf_counter() - started:.2f}s")
+        for record in sli_results.dropna(subset=["thresholdOperator"]).itertuples(index=False):
+            if not record.total_events:
+                print(f"  {record.service_id} {record.sliName}: no data")
+                continue
+            print(f"  {record.service_id} {record.sliName}: p99 {record.p99:.1f} {record.thresholdOperator} "
+                  f"{record.thresholdValue:g} {'met' if record.tail_meets_threshold else 'missed'}, "
+                  f"{record.good_events / max(record.total_events, 1):.2%} of samples compliant, "
+                  f"{int(record.compliant_slices)}/{int(record.slices)} slices compliant")
+    
+    if args.backtest and metric_history is not None:
+        started = time.perf_counter()
+        candidates = parse_threshold_grid(args.backtest_thresholds)
+        windows = args.backtest_windows.split(",")
+        stages["backtest"] = backtest = backtest_alerting(metric_history, catalog, candidates, windows)
+        print(f"Backtested {len(candidates) * len(windows)} candidate thresholds for "
+              f"{backtest['service_id'].nunique()} services in {time.perf_counter() - started:.2f}s")
+    
+    if args.recommend_slos and metric_history is not None:
+        recommendations = recommend_slos(metric_history, catalog, args.recommend_windows.split(","))
+        stages["slo_recommendations"] = recommendations
+        changed = recommendations[recommendations["recommended_sloTarget"] != recommendations["sloTarget"]]
+        print(f"Recommended SLO targets for {len(recommendations)} services ({len(changed)} differ from current)")
+    
+    if args.impact_cost:
+        stages["impact_cost"] = impact_cost = compute_impact_cost(catalog, metric_history, args.incidents)
+        at_risk = impact_cost.loc[impact_cost["level"] == "total", "dollars_at_risk"].sum()
+        print(f"Estimated ${at_risk:,.0f} at risk across {(impact_cost['level'] == 'service').sum()} service periods")
+    
+    workbook = create_bos_workbook(metric_history=metric_history, catalog=catalog, change_log=change_log, **stages)
+    workbook.custom_doc_props.append(StringProperty(name=INPUT_DIGEST_PROPERTY, value=input_digest(args)))
+    size_report = save_workbook(workbook, args.output, compression_level=args.compression_level)
+    print(f"Workbook saved to: {args.output}")
+    if args.report_sizes:
+        print_part_sizes(size_report)
+    if args.site:
+        started = time.perf_counter()
+        written, unchanged, removed = build_site(catalog, metric_history, args.site, args.site_workers,
+                                                 stages["sli_results"])
+        print(f"Dashboard site written to: {args.site} ({written} pages written, {unchanged} unchanged, "
+              f"{removed} removed in {time.perf_counter() - started:.2f}s)")
+    return stages
+
+def watch_sources(args):
+    """Rebuild the workbook (and --site) whenever the catalog CSVs or the metric history change"""
+    sources = {table: os.path.join(args.catalog, f"{table}.csv") for table in CATALOG_TABLES}
+    sources["metrics"] = args.metrics
+    
+    # Parsed catalog, metric history and event store connections stay warm between rebuilds
+    catalog = load_catalog(args.catalog)
+    metric_history = load_metric_history(args.metrics)
+    if args.events and args.sample_events:
+        write_sample_event_store(args.events)
+    pool = EventStorePool(args.events, args.sli_workers) if args.events else None
+    build_outputs(args, catalog, metric_history, pool=pool)
+    print(f"Watching {args.catalog} and {args.metrics} for changes (Ctrl+C to stop)")
+    
+    stamps = {name: source_stamp(path) for name, path in sources.items()}
+    try:
+        while True:
+            time.sleep(WATCH_POLL_INTERVAL)
+            current = {name: source_stamp(path) for name, path in sources.items()}
+            if current == stamps:
+                continue
+            
+            # Editors and exports often write a file several times in a row
+            while True:
+                time.sleep(args.debounce)
+                settled = {name: source_stamp(path) for name, path in sources.items()}
+                if settled == current:
+                    break
+                current = settled
+            
+            changed = [name for name in sources if current[name] != stamps[name]]
+            stamps = current
+            started = time.perf_counter()
+            
+            # Only the changed sources are parsed again
+            changed_tables = [name for name in changed if name in CATALOG_TABLES]
+            new_catalog = dict(catalog)
+            new_history = metric_history
+            try:
+                for table in changed_tables:
+                    new_catalog[table] = catalog_rows(read_catalog_csv(args.catalog, table))
+                if "metrics" in changed:
+                    new_history = load_metric_history(args.metrics)
+            except (OSError, ValueError) as error:
+                print(f"Could not read {', '.join(changed)}: {error}. Keeping the last good data")
+                continue
+            
+            # The sources become the last good data only once a rebuild succeeds, so the next
+            # edit is diffed against what the outputs last showed and a bad edit cannot stop the watcher
+            try:
+                change_log = diff_catalogs(catalog, new_catalog, changed_tables)
+                if change_log.empty and "metrics" not in changed:
+                    print(f"{', '.join(changed)} saved without content changes")
+                    continue
+                build_outputs(args, new_catalog, new_history, change_log, pool)
+            except Exception as error:
+                print(f"Could not rebuild {args.output} after changes to {', '.join(changed)}: "
+                      f"{type(error).__name__}: {error}. Keeping the last good data")
+                continue
+            catalog, metric_history = new_catalog, new_history
+            elapsed = time.perf_counter() - started
+            print(f"Rebuilt {args.output} in {elapsed:.2f}s after changes to {', '.join(changed)}: "
+                  f"{summarize_changes(change_log) or 'metrics only'}")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+    finally:
+        if pool:
+            pool.close()
+
+def index_catalog(catalog):
+    """Catalog rows as dicts grouped by service_id, in table order"""
+    index = {}
+    for table in CATALOG_TABLES:
+        rows = catalog[table]
+        by_service = index.setdefault(table, {})
+        for row in rows[1:]:
+            by_service.setdefault(row[0], []).append(dict(zip(rows[0], row)))
+    return index
+
+def subset_catalog(catalog, service_ids):
+    """Catalog restricted to the given services"""
+    wanted = set(service_ids)
+    return {table: [rows[0]] + [row for row in rows[1:] if row[0] in wanted] for table, rows in catalog.items()}
+
+def filter_catalog(catalog, service_ids=None, business_unit=None):
+    """Catalog restricted to the listed services and/or one business unit"""
+    if business_unit is not None:
+        services = catalog["Services"]
+        unit_idx = services[0].index("businessUnit")
+        unit_ids = {row[0] for row in services[1:] if row[unit_idx] == business_unit}
+        service_ids = unit_ids if service_ids is None else unit_ids & set(service_ids)
+    if service_ids is None:
+        return catalog
+    return subset_catalog(catalog, service_ids)
+
+def service_status(current, slo):
+    """OK / WARNING / CRITICAL by comparing the current rate with the alerting and page thresholds"""
+    if current is None or not slo:
+        return "Unknown"
+    if slo.get("alertingThreshold") in ("", None) or slo.get("pageThreshold") in ("", None):
+        return "Unknown"
+    if current >= float(slo["alertingThreshold"]):
+        return "✅ OK"
+    if current >= float(slo["pageThreshold"]):
+        return "⚠️ WARNING"
+    return "🔴 CRITICAL"
+
+def service_dashboard(index, trends, service_id, records=()):
+    """The fields create_dashboard_sheet shows for one service, as a dict
+    
+    records are the service's evaluated SLIs (see sli_records); CURRENT and
+    STATUS come from the first one with events, like the Dashboard lookup.
+    """
+    def first(table):
+        # Dashboard lookups use MATCH(..., 0), i.e. the first row of the service
+        rows = index[table].get(service_id)
+        return rows[0] if rows else {}
+    
+    service, sli, slo = first("Services"), first("SLI_Definitions"), first("SLO_Configurations")
+    impact, ops = first("Impact_Assessments"), first("Operational_Metadata")
+    series = trends.get(service_id)
+    result = next(filter(None, (sli_result_row(record, slo) for record in records)), None)
+    current = result["current"] if result else None
+    
+    return {
+        "service_id": service_id,
+        "displayName": service.get("displayName"),
+        "serviceContext": {
+            "serviceName": service.get("serviceName"),
+            "tierLevel": service.get("tierLevel"),
+            "businessPurpose": service.get("businessPurpose"),
+            "performanceQuestion": service.get("performanceQuestion"),
+        },
+        "serviceLevelIndicators": {
+            "sliName": sli.get("sliDisplayName"),
+            "current": current,
+            "target": slo.get("sloTarget"),
+            "status": result["status"] if result else "Unknown",
+            "trend": classify_trend(series) if series is not None else "📊 No Data",
+            "trendPoints": [round(float(v), 2) for v in series] if series is not None else [],
+            "goodEvents": sli.get("goodEventsCriteria_PO"),
+            "totalEvents": sli.get("totalEventsCriteria_PO"),
+            "technicalQuery": sli.get("goodEventsCriteria_Dev"),
+        },
+        "businessImpact": {
+            "scenario": impact.get("failureScenario"),
+            "impact": impact.get("businessConsequence"),
+            "affectedCount": impact.get("stakeholderCount"),
+            "affectedType": impact.get("stakeholderType"),
+            "financial": impact.get("financialImpact"),
+        },
+        "ownership": {
+            "productOwner": service.get("productOwner"),
+            "technicalOwner": sli.get("technicalOwner"),
+            "status": ops.get("status"),
+            "serviceType": service.get("serviceType"),
+            "businessUnit": service.get("businessUnit"),
+        },
+    }
+
+def service_profile(index, service_id):
+    """Every catalog field of one service, with all of its impact assessments"""
+    profile = {"service_id": service_id}
+    for table in CATALOG_TABLES:
+        rows = [{k: v for k, v in row.items() if k != "service_id"} for row in index[table].get(service_id, [])]
+        profile[table] = rows if table == "Impact_Assessments" else (rows[0] if rows else {})
+    return profile
+
+class ArtifactCache:
+    """LRU cache of generated responses that also shares in-flight generation between requests"""
+    
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.version = None
+        self._entries = OrderedDict()
+        self._pending = {}
+    
+    async def get(self, key, generate, version=None):
+        """Return (body, etag) for key, calling generate() in a worker thread on a miss
+        
+        A new version of the source data drops every cached response.
+        """
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+        key = (version, key)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            body = await asyncio.get_running_loop().run_in_executor(None, generate)
+            entry = (body, f'"{hashlib.sha256(body).hexdigest()[:20]}"')
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            future.set_result(entry)
+            return entry
+        except Exception as error:
+            future.set_exception(error)
+            raise
+        finally:
+            del self._pending[key]
+
+class DashboardService:
+    """Local HTTP service serving dashboard JSON, profiles and workbooks from an in-memory catalog"""
+    
+    def __init__(self, catalog, metric_history, cache_size, db_path=None, sli_results=None, sources=()):
+        # With a SQLite catalog every request reads only its services through the indexes
+        self.catalog = catalog
+        self.db_path = db_path
+        self.metric_history = metric_history
+        self.index = index_catalog(catalog) if db_path is None else None
+        
+        # route() checks services and product lines with dict lookups, or on one held SQLite connection
+        self.connection = None
+        self.business_units = {}
+        if db_path is None:
+            for sid, rows in self.index["Services"].items():
+                self.business_units.setdefault(rows[0].get("businessUnit"), []).append(sid)
+        else:
+            self.connection = open_catalog_db(db_path)
+        trend_ids = [] if metric_history is None else list(metric_history["service_id"].unique())
+        self.trends = service_trend_series(metric_history, trend_ids)
+        
+        # CURRENT and STATUS come from the same evaluated SLIs as the workbook's SLI_Results sheet
+        self.sli_results = sli_results
+        self.sli_records = {}
+        for record in sli_records(sli_results if sli_results is not None else metric_sli_results(metric_history)):
+            self.sli_records.setdefault(record["service_id"], []).append(record)
+        self.cache = ArtifactCache(cache_size)
+        
+        # Served workbooks are dated by their sources, so regenerated bytes and ETags stay the same:
+        # the files loaded at startup, and the SQLite catalog as of each generation
+        self.loaded = snapshot_time(sources) or datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+    
+    def fetch_catalog(self, service_ids=None, business_unit=None):
+        """Catalog subset for the given services or business unit"""
+        if self.db_path is not None:
+            return load_catalog_db(self.db_path, service_ids, business_unit)
+        return filter_catalog(self.catalog, service_ids, business_unit)
+    
+    def service_summaries(self):
+        """(service_id, displayName, businessUnit) of every service"""
+        if self.db_path is not None:
+            connection = open_catalog_db(self.db_path)
+            try:
+                query = 'SELECT service_id, displayName, businessUnit FROM "Services" ORDER BY rowid'
+                return connection.execute(query).fetchall()
+            finally:
+                connection.close()
+        return [(sid, rows[0].get("displayName"), rows[0].get("businessUnit"))
+                for sid, rows in self.index["Services"].items()]
+    
+    def has_service(self, service_id):
+        """Whether the catalog has the service"""
+        if self.connection is None:
+            return service_id in self.index["Services"]
+        query = 'SELECT 1 FROM "Services" WHERE service_id = ? LIMIT 1'
+        return self.connection.execute(query, [service_id]).fetchone() is not None
+    
+    def has_product_line(self, business_unit):
+        """Whether any service belongs to the business unit"""
+        if self.connection is None:
+            return business_unit in self.business_units
+        query = 'SELECT 1 FROM "Services" WHERE businessUnit = ? LIMIT 1'
+        return self.connection.execute(query, [business_unit]).fetchone() is not None
+    
+    def catalog_version(self):
+        """Changes whenever another connection commits to the SQLite catalog; the in-memory catalog is fixed"""
+        if self.connection is None:
+            return None
+        return self.connection.execute("PRAGMA data_version").fetchone()[0]
+    
+    def route(self, path):
+        """Map a request path to (cache key, content type, generator, download name), or None"""
+        parts = [unquote(part) for part in path.split("?")[0].strip("/").split("/") if part]
+        
+        if parts in ([], ["services"]):
+            return ("services",), JSON_CONTENT_TYPE, self.service_list_json, None
+        if parts == ["workbook.xlsx"]:
+            return ("workbook",), XLSX_CONTENT_TYPE, lambda: self.workbook_bytes(), "BOS_Dashboard.xlsx"
+        if len(parts) == 2 and parts[0] == "services":
+            name = parts[1]
+            if name.endswith(".xlsx") and self.has_service(name[:-5]):
+                service_id = name[:-5]
+                return (("workbook", service_id), XLSX_CONTENT_TYPE,
+                        lambda: self.workbook_bytes([service_id]), f"BOS_{service_id}.xlsx")
+            if self.has_service(name):
+                return (("dashboard", name), JSON_CONTENT_TYPE,
+                        lambda: json_bytes(service_dashboard(index_catalog(self.fetch_catalog([name])), self.trends, name,
+                                                             self.sli_records.get(name, ()))),
+                        None)
+        if len(parts) == 3 and parts[0] == "services" and parts[2] == "profile" and self.has_service(parts[1]):
+            service_id = parts[1]
+            return (("profile", service_id), JSON_CONTENT_TYPE,
+                    lambda: json_bytes(service_profile(index_catalog(self.fetch_catalog([service_id])), service_id)),
+                    None)
+        if len(parts) == 2 and parts[0] == "product-lines" and parts[1].endswith(".xlsx"):
+            # Product lines are the businessUnit values of the Services table
+            product_line = parts[1][:-5]
+            if self.has_product_line(product_line):
+                return (("product-line", product_line), XLSX_CONTENT_TYPE,
+                        lambda: self.workbook_bytes(business_unit=product_line),
+                        f"BOS_{product_line.replace(' ', '_')}.xlsx")
+        return None
+    
+    def service_list_json(self):
+        """Services with their display names and product lines"""
+        return json_bytes([
+            {"service_id": sid, "displayName": display_name, "businessUnit": business_unit}
+            for sid, display_name, business_unit in self.service_summaries()
+        ])
+    
+    def workbook_bytes(self, service_ids=None, business_unit=None):
+        """Build the workbook for the given services (default: all) in memory"""
+        subset = self.fetch_catalog(service_ids, business_unit)
+        service_ids = [row[0] for row in subset["Services"][1:]]
+        history = None
+        if self.metric_history is not None:
+            history = self.metric_history[self.metric_history["service_id"].isin(service_ids)]
+        stamp = max(self.loaded, snapshot_time([self.db_path]) or self.loaded)
+        workbook = create_bos_workbook(history, subset, sli_results=self.sli_results, created=stamp)
+        buffer = io.BytesIO()
+        save_workbook(workbook, buffer, modified=stamp)
+        return buffer.getvalue()
+    
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self.respond(writer, method, path, headers, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def respond(self, writer, method, path, headers, keep_alive):
+        """Write the response for one request"""
+        extra_headers = {}
+        if method not in ("GET", "HEAD"):
+            status, content_type, body = "405 Method Not Allowed", "text/plain", b"Method not allowed\n"
+            extra_headers["Allow"] = "GET, HEAD"
+        else:
+            route = self.route(path)
+            if route is None:
+                status, content_type, body = "404 Not Found", "text/plain", b"Not found\n"
+            else:
+                key, content_type, generate, download_name = route
+                try:
+                    body, etag = await self.cache.get(key, generate, self.catalog_version())
+                except Exception as error:
+                    status, content_type, body = "500 Internal Server Error", "text/plain", f"{error}\n".encode("utf-8")
+                else:
+                    status = "200 OK"
+                    extra_headers["ETag"] = etag
+                    extra_headers["Cache-Control"] = "no-cache"
+                    if download_name:
+                        extra_headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+                    if etag in [tag.strip() for tag in headers.get("if-none-match", "").split(",")]:
+                        status, body = "304 Not Modified", b""
+        
+        head = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}", f"Content-Length: {len(body)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        head += [f"{name}: {value}" for name, value in extra_headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+        if method != "HEAD":
+            writer.write(body)
+        await writer.drain()
+
+def json_bytes(document):
+    """Serialize a JSON response body"""
+    return json.dumps(document, indent=2, default=str, ensure_ascii=False).encode("utf-8")
+
+def serve_dashboards(args):
+    """Run the local HTTP service until interrupted"""
+    metric_history = load_metric_history(args.metrics)
+    db_path = args.catalog if args.catalog and is_catalog_db(args.catalog) else None
+    catalog = None
+    if db_path is None:
+        catalog = load_catalog(args.catalog) if args.catalog else create_sample_catalog()
+    
+    # SLIs are evaluated once at startup, so JSON and workbooks agree with a --events build
+    sli_results = None
+    if args.events:
+        if args.sample_events:
+            write_sample_event_store(args.events)
+        with contextlib.closing(EventStorePool(args.events, args.sli_workers)) as pool:
+            sli_results = evaluate_slis(catalog or load_catalog_db(db_path), pool, args.sli_workers)
+        print(f"Evaluated {len(sli_results)} SLIs against {args.events}")
+    service = DashboardService(catalog, metric_history, args.cache_size, db_path=db_path, sli_results=sli_results,
+                               sources=[None if db_path else args.catalog, args.metrics])
+    
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, args.host, args.port)
+        print(f"Serving BOS dashboards on http://{args.host}:{args.port}/ (Ctrl+C to stop)")
+        print("  /services, /services/<id>, /services/<id>/profile, /services/<id>.xlsx,")
+        print("  /product-lines/<businessUnit>.xlsx, /workbook.xlsx")
+        async with server:
+            await server.serve_forever()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\nStopped serving")
+
+def compile_template(text):
+    """Split a {field} template into literal and field parts once, so rendering only joins strings"""
+    parts = [(literal, field) for literal, field, _, _ in string.Formatter().parse(text)]
+    
+    def render(fields):
+        # Fields ending in _html are pre-rendered fragments, everything else is escaped text
+        out = []
+        for literal, field in parts:
+            out.append(literal)
+            if field is not None:
+                value = fields[field]
+                out.append(value if field.endswith("_html") else html.escape("" if value is None else str(value)))
+        return "".join(out)
+    return render
+
+SITE_PAGE = compile_template(SITE_PAGE_TEMPLATE)
+SITE_SERVICE_BODY = compile_template(SITE_SERVICE_TEMPLATE)
+SITE_INDEX_BODY = compile_template(SITE_INDEX_TEMPLATE)
+SITE_SPARKLINE = compile_template(SITE_SPARKLINE_TEMPLATE)
+SITE_LINK = compile_template('<a href="{href}">{label}</a>')
+SITE_CELL = compile_template("<td>{value_html}</td>")
+SITE_HEADER_CELL = compile_template("<th>{label}</th>")
+# Any template or stylesheet change invalidates every page in the site manifest
+SITE_TEMPLATE_DIGEST = hashlib.sha256("\0".join([
+    BUILDER_VERSION, SITE_PAGE_TEMPLATE, SITE_SERVICE_TEMPLATE, SITE_INDEX_TEMPLATE, SITE_SPARKLINE_TEMPLATE, SITE_STYLESHEET,
+]).encode("utf-8")).hexdigest()
+
+def site_slug(name):
+    """File name of a product line, product or service page"""
+    return re.sub(r"[^A-Za-z0-9]+", "-", str(name)).strip("-").lower() or "unassigned"
+
+def percent_text(value):
+    """A rate formatted like the Dashboard's TEXT(value, "0.0#") & "%" """
+    return excel_text(value, "0.0#") + "%"
+
+def defined(value, missing="Not Defined"):
+    """The Dashboard's IFERROR fallback for empty catalog fields"""
+    return missing if value in ("", None) else value
+
+def sparkline_svg(points):
+    """Inline SVG polyline of a downsampled trend series"""
+    if len(points) < 2:
+        return ""
+    low, high = min(points), max(points)
+    span = (high - low) or 1.0
+    step = SPARKLINE_WIDTH / (len(points) - 1)
+    coordinates = " ".join(
+        f"{i * step:.1f},{SPARKLINE_HEIGHT - (value - low) / span * SPARKLINE_HEIGHT:.1f}"
+        for i, value in enumerate(points)
+    )
+    return SITE_SPARKLINE({"points": coordinates, "low": percent_text(low), "high": percent_text(high)})
+
+def render_site_page(path, kind, fields):
+    """Render one page from its fields; links are relative to the site root"""
+    root = "../" * path.count("/")
+    crumbs = " &rsaquo; ".join(
+        SITE_LINK({"href": root + href, "label": label}) if href else html.escape(label)
+        for label, href in fields["crumbs"]
+    )
+    if kind == "service":
+        body = SITE_SERVICE_BODY(dict(fields, sparkline_html=sparkline_svg(fields["trendPoints"])))
+    else:
+        rows = []
+        for row in fields["rows"]:
+            cells = "".join(
+                SITE_CELL({"value_html": SITE_LINK({"href": root + href, "label": label}) if href else html.escape(str(label))})
+                for label, href in row
+            )
+            rows.append(f"<tr>{cells}</tr>")
+        body = SITE_INDEX_BODY({
+            "heading": fields["heading"],
+            "header_html": "".join(SITE_HEADER_CELL({"label": label}) for label in fields["columns"]),
+            "rows_html": "\n".join(rows),
+        })
+    return SITE_PAGE({"title": fields["title"], "root": root, "crumbs_html": crumbs, "body_html": body,
+                      "version": BUILDER_VERSION})
+
+def write_site_pages(site_dir, pages):
+    """Render and write a chunk of (path, kind, fields) pages; runs in a worker process"""
+    for path, kind, fields in pages:
+        target = os.path.join(site_dir, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target + ".tmp", "w", encoding="utf-8") as f:
+            f.write(render_site_page(path, kind, fields))
+        os.replace(target + ".tmp", target)
+    return len(pages)
+
+def status_counts(dashboards):
+    """Services per dashboard status label (OK, WARNING, CRITICAL, Unknown)"""
+    counts = {label: 0 for label in SITE_STATUS_LABELS}
+    for dashboard in dashboards:
+        counts[dashboard["serviceLevelIndicators"]["status"].split()[-1]] += 1
+    return [[counts[label], None] for label in SITE_STATUS_LABELS]
+
+def site_pages(index, trends, service_ids, records_by_service):
+    """Every page of the site as {path: (kind, fields)}: services plus L3 and L4 index pages"""
+    pages = {}
+    hierarchy = {}
+    home = ["All Product Lines", "index.html"]
+    
+    # Service pages, grouped into L4 product line / L3 product as we go
+    for service_id in dict.fromkeys(service_ids):
+        service = index["Services"][service_id][0]
+        l4 = defined(service.get("l4_product_line") or service.get("businessUnit"), "Unassigned")
+        l3 = defined(service.get("l3_product"), "Unassigned")
+        l4_path = f"l4/{site_slug(l4)}.html"
+        l3_path = f"l3/{site_slug(l4)}/{site_slug(l3)}.html"
+        
+        dashboard = service_dashboard(index, trends, service_id, records_by_service.get(service_id, ()))
+        context, sli = dashboard["serviceContext"], dashboard["serviceLevelIndicators"]
+        impact, ownership = dashboard["businessImpact"], dashboard["ownership"]
+        path = f"services/{site_slug(service_id)}.html"
+        title = defined(dashboard["displayName"], service_id)
+        pages[path] = ("service", {
+            "title": title,
+            "crumbs": [home, [l4, l4_path], [l3, l3_path], [title, None]],
+            "serviceName": defined(context["serviceName"]),
+            "tierLevel": defined(context["tierLevel"]),
+            "businessPurpose": defined(context["businessPurpose"]),
+            "performanceQuestion": defined(context["performanceQuestion"]),
+            "sliName": defined(sli["sliName"]),
+            "current": "No Data" if sli["current"] is None else percent_text(sli["current"]),
+            "target": "No Target" if sli["target"] in ("", None) else f"{float(sli['target']):g}%",
+            "status": sli["status"],
+            "trend": sli["trend"],
+            "trendPoints": sli["trendPoints"],
+            "goodEvents": defined(sli["goodEvents"]),
+            "totalEvents": defined(sli["totalEvents"]),
+            "technicalQuery": defined(sli["technicalQuery"]),
+            "scenario": defined(impact["scenario"]),
+            "impact": defined(impact["impact"]),
+            "affectedCount": defined(impact["affectedCount"], ""),
+            "affectedType": defined(impact["affectedType"], ""),
+            "financial": defined(impact["financial"]),
+            "productOwner": defined(ownership["productOwner"]),
+            "technicalOwner": defined(ownership["technicalOwner"]),
+            "operationalStatus": defined(ownership["status"]),
+            "serviceType": defined(ownership["serviceType"]),
+            "businessUnit": defined(ownership["businessUnit"]),
+            "service_id": service_id,
+        })
+        hierarchy.setdefault((l4, l4_path), {}).setdefault((l3, l3_path), []).append((path, dashboard))
+    
+    # L3 pages list services, L4 pages list products, the home page lists product lines
+    l4_rows = []
+    for (l4, l4_path), products in sorted(hierarchy.items()):
+        l3_rows = []
+        for (l3, l3_path), services in sorted(products.items()):
+            dashboards = [dashboard for _, dashboard in services]
+            pages[l3_path] = ("index", {
+                "title": f"{l3} Services",
+                "crumbs": [home, [l4, l4_path], [l3, None]],
+                "heading": f"{l3.upper()} SERVICES",
+                "columns": ["Service", "Service ID", "Tier Level", "Current", "Target", "Status", "Trend"],
+                "rows": [
+                    [[pages[path][1]["title"], path], [dashboard["service_id"], None],
+                     [pages[path][1]["tierLevel"], None], [pages[path][1]["current"], None],
+                     [pages[path][1]["target"], None], [pages[path][1]["status"], None],
+                     [pages[path][1]["trend"], None]]
+                    for path, dashboard in sorted(services, key=lambda item: str(pages[item[0]][1]["title"]))
+                ],
+            })
+            l3_rows.append([[l3, l3_path], [len(services), None]] + status_counts(dashboards))
+        
+        dashboards = [dashboard for services in products.values() for _, dashboard in services]
+        pages[l4_path] = ("index", {
+            "title": f"{l4} Products",
+            "crumbs": [home, [l4, None]],
+            "heading": f"{l4.upper()} PRODUCTS",
+            "columns": ["Product", "Services"] + SITE_STATUS_LABELS,
+            "rows": l3_rows,
+        })
+        l4_rows.append([[l4, l4_path], [len(products), None], [len(dashboards), None]] + status_counts(dashboards))
+    
+    pages["index.html"] = ("index", {
+        "title": "Business Observability Service Dashboards",
+        "crumbs": [[home[0], None]],
+        "heading": "PRODUCT LINES",
+        "columns": ["Product Line", "Products", "Services"] + SITE_STATUS_LABELS,
+        "rows": l4_rows,
+    })
+    return pages
+
+def write_if_changed(path, content):
+    """Write a text file unless it already holds exactly this content; returns True when written"""
+    data = content.encode("utf-8")
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+def build_site(catalog, metric_history, site_dir, workers=None, sli_results=None):
+    """Write the static HTML dashboard site, rendering only pages whose inputs changed since the last build
+    
+    CURRENT and STATUS come from sli_results (the --events evaluation) when
+    given, otherwise from the metric history totals, as on the workbook.
+    """
+    index = index_catalog(catalog)
+    service_ids = [row[0] for row in catalog["Services"][1:] if row[0]]
+    records_by_service = {}
+    for record in sli_records(sli_results if sli_results is not None else metric_sli_results(metric_history)):
+        records_by_service.setdefault(record["service_id"], []).append(record)
+    pages = site_pages(index, service_trend_series(metric_history, service_ids), service_ids, records_by_service)
+    
+    # The stylesheet is one shared asset, linked rather than inlined on every page
+    os.makedirs(os.path.join(site_dir, SITE_ASSET_DIR), exist_ok=True)
+    write_if_changed(os.path.join(site_dir, SITE_ASSET_DIR, SITE_STYLESHEET_NAME), SITE_STYLESHEET)
+    
+    # Each page is keyed by a digest of its fields and the templates; unchanged pages are not dispatched
+    manifest_path = os.path.join(site_dir, SITE_MANIFEST)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            previous = json.load(f)
+    digests = {
+        path: hashlib.sha256(
+            (SITE_TEMPLATE_DIGEST + json.dumps([kind, fields], sort_keys=True, default=str)).encode("utf-8")
+        ).hexdigest()
+        for path, (kind, fields) in pages.items()
+    }
+    changed = [
+        (path, kind, fields) for path, (kind, fields) in pages.items()
+        if previous.get(path) != digests[path] or not os.path.exists(os.path.join(site_dir, path))
+    ]
+    
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(changed) > SITE_PAGE_CHUNK:
+        chunks = [changed[i:i + SITE_PAGE_CHUNK] for i in range(0, len(changed), SITE_PAGE_CHUNK)]
+        with ProcessPoolExecutor(min(workers, len(chunks))) as executor:
+            list(executor.map(write_site_pages, [site_dir] * len(chunks), chunks))
+    else:
+        write_site_pages(site_dir, changed)
+    
+    # Pages of services no longer in the catalog are removed
+    stale = [path for path in previous if path not in pages]
+    for path in stale:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(site_dir, path))
+    
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(digests, f, indent=0, sort_keys=True)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return len(changed), len(pages) - len(changed), len(stale)
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Build the BOS Excel Dashboard Prototype workbook")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_PATH, help="Path of the workbook to write")
+    parser.add_argument("--catalog",
+                        help="SQLite catalog (.db), directory of <table>.csv files or a built workbook "
+                             "to read the 5 tables from (default: sample data)")
+    parser.add_argument("--services", help="Comma-separated service_ids to build the workbook for")
+    parser.add_argument("--business-unit", help="Build the workbook for one business unit only")
+    parser.add_argument("--previous",
+                        help="Catalog snapshot to diff against for the Change_Log sheet (default with --change-log-json "
+                             "or --skip-unchanged: the existing output workbook)")
+    parser.add_argument("--change-log-json", help="Also write the catalog differences to this JSON file")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="Do not rebuild when the catalog matches the previous snapshot and the "
+                             "--metrics, --events and --incidents inputs match the previous build")
+    parser.add_argument("--metrics", default=DEFAULT_METRICS_PATH,
+                        help="SLI metric history CSV used for trend charts (timestamp, service_id, good_events, total_events)")
+    parser.add_argument("--events", metavar="DIR",
+                        help="Event store of <database>.db SQLite files; SLI criteria are evaluated against it "
+                             "for the Dashboard CURRENT and STATUS values (default: totals from --metrics)")
+    parser.add_argument("--sample-events", action="store_true",
+                        help="Write a synthetic loans/lending event store to --events before evaluating")
+    parser.add_argument("--sli-workers", type=int, default=DEFAULT_SLI_WORKERS,
+                        help="Source tables evaluated in parallel, each worker borrowing a pooled connection")
+    parser.add_argument("--backtest", action="store_true",
+                        help="Replay the --metrics history against current and candidate alert thresholds "
+                             "and add a Threshold_Backtest sheet")
+    parser.add_argument("--backtest-thresholds", default=DEFAULT_BACKTEST_THRESHOLDS,
+                        help="Candidate thresholds as start:stop:step or a comma-separated list")
+    parser.add_argument("--backtest-windows", default=DEFAULT_BACKTEST_WINDOWS,
+                        help="Comma-separated candidate evaluation windows, e.g. 5m,15m,1h")
+    parser.add_argument("--recommend-slos", action="store_true",
+                        help="Recommend SLO targets and thresholds from rolling-window percentiles of the --metrics "
+                             "history and add an SLO_Recommendations sheet")
+    parser.add_argument("--recommend-windows", default=DEFAULT_RECOMMEND_WINDOWS,
+                        help="Comma-separated rolling windows analyzed for --recommend-slos, e.g. 7d,28d")
+    parser.add_argument("--impact-cost", action="store_true",
+                        help="Estimate customers affected and dollars at risk from Impact_Assessments, --metrics "
+                             "failures and --incidents, and add an Impact_Cost sheet")
+    parser.add_argument("--incidents", default=DEFAULT_INCIDENTS_PATH,
+                        help="Incidents CSV (incident_id, severity, status, started, service_id) for --impact-cost")
+    parser.add_argument("--site", metavar="DIR",
+                        help="Also write a static HTML dashboard site: a page per service plus L4/L3 index pages")
+    parser.add_argument("--site-workers", type=int,
+                        help="Processes rendering --site pages (default: one per CPU)")
+    parser.add_argument("--compression-level", type=int, default=DEFAULT_COMPRESSION_LEVEL,
+                        choices=range(10), metavar="0-9",
+                        help="Zip compression level: 1 saves fastest, 9 gives the smallest file, 0 stores uncompressed")
+    parser.add_argument("--report-sizes", action="store_true", help="Print byte sizes of each workbook part")
+    parser.add_argument("--export-catalog", metavar="DIR",
+                        help="Write the catalog as <table>.csv files to DIR, for editing and --watch")
+    parser.add_argument("--export-db", metavar="PATH",
+                        help="Write the catalog to a SQLite database (WAL mode, indexed on service_id and businessUnit)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Keep running and rebuild whenever the --catalog CSVs or --metrics file change")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_WATCH_DEBOUNCE,
+                        help="Seconds the sources must stay unchanged before a watch rebuild")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run a local HTTP service with dashboard JSON and on-demand workbooks")
+    parser.add_argument("--host", default=DEFAULT_SERVE_HOST, help="Address the --serve HTTP service listens on")
+    parser.add_argument("--port", type=int, default=DEFAULT_SERVE_PORT, help="Port the --serve HTTP service listens on")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_SERVE_CACHE_SIZE,
+                        help="Generated responses the --serve HTTP service keeps in memory")
+    args = parser.parse_args()
+    if args.watch and not (args.catalog and os.path.isdir(args.catalog)):
+        parser.error("--watch needs --catalog pointing at a directory of <table>.csv files")
+    if any(parse_time_window(window) is None for window in args.backtest_windows.split(",")):
+        parser.error("--backtest-windows takes durations such as 5m,15m,1h")
+    if any(parse_time_window(window) is None for window in args.recommend_windows.split(",")):
+        parser.error("--recommend-windows takes durations such as 7d,28d")
+    serve_only = [option for option, used in [("--backtest", args.backtest), ("--recommend-slos", args.recommend_slos),
+                                              ("--impact-cost", args.impact_cost), ("--site", args.site)] if used]
+    if args.serve and serve_only:
+        parser.error(f"{', '.join(serve_only)} cannot be combined with --serve; served workbooks hold the core sheets")
+    if args.sample_events and not args.events:
+        parser.error("--sample-events needs --events DIR to write the event store to")
+    return args
+
 # Main execution
 if __name__ == "__main__":
+    args = parse_args()
+    if args.watch:
+        watch_sources(args)
+        sys.exit(0)
+    if args.serve:
+        serve_dashboards(args)
+        sys.exit(0)
+    
     print("Building BOS Excel Dashboard Prototype...")
-    workbook = create_bos_workbook()
+    service_ids = args.services.split(",") if args.services else None
+    if args.catalog:
+        catalog = load_catalog(args.catalog, service_ids, args.business_unit)
+    else:
+        catalog = filter_catalog(create_sample_catalog(), service_ids, args.business_unit)
+    if args.export_db:
+        write_catalog_db(catalog, args.export_db)
+        print(f"Catalog database written to: {args.export_db}")
+    if args.export_catalog:
+        write_catalog_csvs(catalog, args.export_catalog)
+        print(f"Catalog CSVs written to: {args.export_catalog}")
+    
+    if args.events and args.sample_events:
+        write_sample_event_store(args.events)
+        print(f"Sample event store written to: {args.events}")
+    
+    # Diff against the previous build (or an explicit snapshot) for the Change_Log sheet
+    change_log, previous_source = diff_previous_build(args, catalog, service_ids)
+    if args.skip_unchanged and change_log is not None and change_log.empty:
+        if read_input_digest(previous_source) == input_digest(args):
+            print("Catalog and inputs unchanged, skipping rebuild")
+            sys.exit(0)
+        print("Catalog unchanged but --metrics, --events or --incidents differ, rebuilding")
+    
+    # Evaluate SLI criteria against the event store instead of summing the metric history
+    metric_history = load_metric_history(args.metrics)
+    pool = EventStorePool(args.events, args.sli_workers) if args.events else None
+    with contextlib.closing(pool) if pool else contextlib.nullcontext():
+        stages = build_outputs(args, catalog, metric_history, change_log, pool)
     
-    # Save to outputs directory
-    output_path = "/mnt/user-data/outputs/BOS_Dashboard_Prototype_v3.4.xlsx"
-    workbook.save(output_path)
-    print(f"Workbook saved to: {output_path}")
     print("\nWorkbook contains:")
     print("- PO_Entry_Form: Product Owner data entry (22 fields)")
     print("- Dev_Entry_Form: Developer data entry (15 fields)")
@@ -971,6 +3790,16 @@ if __name__ == "__main__":
     print("- SLO_Configurations: Performance targets and thresholds")
     print("- Impact_Assessments: Business impact scenarios")
     print("- Operational_Metadata: Deployment and lifecycle information")
+    print("- Trend_Data (hidden): Downsampled SLI history feeding the dashboard trend chart")
+    print("- SLI_Results (hidden): Evaluated good/total events behind the dashboard CURRENT and STATUS")
+    if change_log is not None:
+        print("- Change_Log: Catalog differences from the previous build")
+    if stages["slo_recommendations"] is not None:
+        print("- SLO_Recommendations: Recommended targets and thresholds next to the current values")
+    if stages["impact_cost"] is not None:
+        print("- Impact_Cost: Customers affected and dollars at risk per service, product line and day")
+    if stages["backtest"] is not None:
+        print("- Threshold_Backtest: Alert/page counts, flapping and time-to-detect of current and recommended thresholds")
     print("\nKey Features:")
     print("✓ Service dropdowns use display names")
     print("✓ Persona fields color-coded (green=PO, blue=Dev, gray=Ops)")
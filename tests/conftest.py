@@ -0,0 +1,11 @@
+"""Make build_bos_excel_v3.4.py importable as build_bos_excel; its file name is not a module name"""
+import importlib.util
+import os
+import sys
+
+BUILDER_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "build_bos_excel_v3.4.py")
+
+spec = importlib.util.spec_from_file_location("build_bos_excel", BUILDER_PATH)
+builder = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = builder
+spec.loader.exec_module(builder)
@@ -0,0 +1,57 @@
+"""backtest_thresholds against a brute-force services x candidates x timestamps cube"""
+import numpy as np
+import pytest
+
+import build_bos_excel as bos
+
+def cube_backtest(rates, thresholds, degraded, flap_points):
+    """Every metric counted evaluation by evaluation, one service and candidate at a time"""
+    n_services, n = rates.shape
+    metrics = ["alerts", "flapping_alerts", "time_in_alert", "false_alert_time", "degradations", "detected",
+               "mean_delay_points"]
+    result = {name: np.zeros(thresholds.shape) for name in metrics}
+    for s in range(n_services):
+        episodes = []
+        for t in range(n):
+            if degraded[s, t] and (t == 0 or not degraded[s, t - 1]):
+                end = t
+                while end < n and degraded[s, end]:
+                    end += 1
+                episodes.append((t, end))
+        healthy = max(int((~degraded[s]).sum()), 1)
+    
+        for c in range(thresholds.shape[1]):
+            breach = [not np.isnan(rate) and rate < thresholds[s, c] for rate in rates[s]]
+            starts = [t for t in range(n) if breach[t] and (t == 0 or not breach[t - 1])]
+            delays = []
+            for start, end in episodes:
+                hits = [t for t in range(start, end) if breach[t]]
+                if hits:
+                    delays.append(hits[0] - start)
+            result["alerts"][s, c] = len(starts)
+            result["flapping_alerts"][s, c] = sum(not all(breach[t:t + flap_points]) for t in starts)
+            result["time_in_alert"][s, c] = sum(breach) / n
+            result["false_alert_time"][s, c] = sum(b and not d for b, d in zip(breach, degraded[s])) / healthy
+            result["degradations"][s, c] = len(episodes)
+            result["detected"][s, c] = len(delays)
+            result["mean_delay_points"][s, c] = np.mean(delays) if delays else np.nan
+    return result
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("flap_points", [1, bos.BACKTEST_FLAP_POINTS])
+def test_backtest_matches_cube(seed, flap_points):
+    rng = np.random.default_rng(seed)
+    n_services, n_candidates, n = 5, 7, 80
+    # A coarse grid makes rates equal to thresholds; NaN windows have no events
+    grid = np.round(np.arange(95, 100.01, 0.5), 1)
+    rates = rng.choice(grid, (n_services, n))
+    rates[rng.random(rates.shape) < 0.1] = np.nan
+    thresholds = rng.choice(grid, (n_services, n_candidates))
+    degraded = rng.random((n_services, n)) < 0.3
+    
+    result = bos.backtest_thresholds(rates, thresholds, degraded, flap_points)
+    expected = cube_backtest(rates, thresholds, degraded, flap_points)
+    for name in ["alerts", "flapping_alerts", "degradations", "detected"]:
+        np.testing.assert_array_equal(result[name], expected[name], err_msg=name)
+    for name in ["time_in_alert", "false_alert_time", "mean_delay_points"]:
+        np.testing.assert_allclose(result[name], expected[name], err_msg=name)
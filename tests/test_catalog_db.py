@@ -0,0 +1,53 @@
+"""SQLite catalog backend: filtered reads in the database against filter_catalog on the same catalog"""
+import contextlib
+import copy
+import sqlite3
+
+import pytest
+
+import build_bos_excel as bos
+
+UNITS = ["Home Lending", "Treasury", "Cards"]
+
+def larger_catalog(n_services=12):
+    """The sample catalog repeated under new service ids, spread over three business units"""
+    sample = bos.create_sample_catalog()
+    catalog = {table: [rows[0]] for table, rows in sample.items()}
+    unit_idx = sample["Services"][0].index("businessUnit")
+    for n in range(n_services):
+        template = sample["Services"][1 + n % 2][0]
+        service_id = f"SVC{n + 1:03d}"
+        for table, rows in sample.items():
+            for row in rows[1:]:
+                if row[0] == template:
+                    row = copy.copy(row)
+                    row[0] = service_id
+                    if table == "Services":
+                        row[unit_idx] = UNITS[n % len(UNITS)]
+                    catalog[table].append(row)
+    return catalog
+
+@pytest.mark.parametrize("service_ids, business_unit", [
+    (None, "Treasury"),
+    (None, "Nowhere"),
+    (["SVC002", "SVC005", "SVC404"], None),
+    (["SVC001", "SVC002", "SVC005"], "Treasury"),
+])
+def test_filtered_reads_match_filter_catalog(tmp_path, service_ids, business_unit):
+    catalog = larger_catalog()
+    path = str(tmp_path / "catalog.db")
+    bos.write_catalog_db(catalog, path)
+    
+    loaded = bos.load_catalog(path, service_ids, business_unit)
+    assert loaded == bos.filter_catalog(catalog, service_ids, business_unit)
+    assert bos.load_catalog(path) == catalog
+
+def test_business_unit_filter_uses_index(tmp_path):
+    path = str(tmp_path / "catalog.db")
+    bos.write_catalog_db(larger_catalog(), path)
+    
+    with contextlib.closing(sqlite3.connect(path)) as connection:
+        plan = connection.execute(
+            'EXPLAIN QUERY PLAN SELECT service_id FROM "Services" WHERE businessUnit = ?', ["Treasury"]
+        ).fetchall()
+    assert any("idx_Services_businessUnit" in row[-1] for row in plan)
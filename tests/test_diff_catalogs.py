@@ -0,0 +1,122 @@
+"""diff_catalogs against a record-by-record, field-by-field comparison"""
+import copy
+import json
+import sys
+
+import numpy as np
+import pytest
+
+import build_bos_excel as bos
+
+def text(value):
+    """Catalog value as the diff compares it: whole floats as integers, missing as empty"""
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def keyed_records(rows, table):
+    """Records by key; repeated keys get #1, #2, ... in row order"""
+    keys = bos.CATALOG_KEYS[table]
+    seen, records = {}, {}
+    for row in rows[1:]:
+        record = {column: text(value) for column, value in zip(rows[0], row)}
+        base = "/".join(record[key] for key in keys)
+        occurrence = seen.get(base, 0)
+        seen[base] = occurrence + 1
+        records[base if occurrence == 0 else f"{base}#{occurrence}"] = record
+    return records
+
+def brute_force_diff(old_catalog, new_catalog):
+    """Every change as a (table, service_id, record_key, change_type, field, old, new) tuple"""
+    changes = set()
+    for table in bos.CATALOG_TABLES:
+        keys = bos.CATALOG_KEYS[table]
+        old, new = keyed_records(old_catalog[table], table), keyed_records(new_catalog[table], table)
+        for key in new.keys() - old.keys():
+            changes.add((table, new[key]["service_id"], key, "added", "", "", ""))
+        for key in old.keys() - new.keys():
+            changes.add((table, old[key]["service_id"], key, "removed", "", "", ""))
+        for key in old.keys() & new.keys():
+            for field in dict.fromkeys(list(old[key]) + list(new[key])):
+                before, after = old[key].get(field, ""), new[key].get(field, "")
+                if field not in keys and before != after:
+                    changes.add((table, old[key]["service_id"], key, "changed", field, before, after))
+    return changes
+
+def random_catalog(rng, n_services):
+    """Catalog with text and integer fields; Impact_Assessments repeats (service_id, impactCategory) keys"""
+    service_ids = [f"SVC{i:03d}" for i in range(n_services)]
+    catalog = {}
+    for table in bos.CATALOG_TABLES:
+        header = bos.CATALOG_KEYS[table] + ["owner", "sloTarget", "notes"]
+        rows = []
+        for sid in service_ids:
+            for _ in range(rng.integers(1, 4) if table == "Impact_Assessments" else 1):
+                keys = [sid] + [str(rng.choice(["customer", "financial"]))][:len(bos.CATALOG_KEYS[table]) - 1]
+                rows.append(keys + [str(rng.choice(["ann", "bo", "cy"])), int(rng.choice([99, 98])),
+                                    str(rng.choice(["", "x", "y"]))])
+        catalog[table] = [header] + rows
+    return catalog
+
+def mutate(rng, catalog):
+    """Drop, add and edit rows, add a column and store one integer column as whole floats"""
+    new = copy.deepcopy(catalog)
+    for table, rows in new.items():
+        header, body = rows[0], rows[1:]
+        body = [row for row in body if rng.random() > 0.1]
+        for row in body:
+            for i in range(len(bos.CATALOG_KEYS[table]), len(header)):
+                if rng.random() < 0.15:
+                    row[i] = row[i] + 1 if isinstance(row[i], int) else row[i] + "!"
+        body += [[f"NEW{i}"] + row[1:] for i, row in enumerate(body[:2])]
+        if table == "Services":
+            header = header + ["tags"]
+            body = [row + [str(rng.choice(["", "core"]))] for row in body]
+        if table == "SLO_Configurations":
+            slo_idx = header.index("sloTarget")
+            for row in body:
+                row[slo_idx] = float(row[slo_idx])
+        new[table] = [header] + body
+    return new
+
+@pytest.mark.parametrize("seed", range(8))
+def test_diff_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    old = random_catalog(rng, 30)
+    new = mutate(rng, old)
+    
+    change_log = bos.diff_catalogs(old, new)
+    assert list(change_log.columns) == bos.CHANGE_LOG_COLUMNS
+    assert set(change_log.itertuples(index=False, name=None)) == brute_force_diff(old, new)
+    assert len(change_log) == len(set(change_log.itertuples(index=False, name=None)))
+    order = change_log[["table", "record_key", "field"]].values.tolist()
+    assert order == sorted(order)
+
+def test_identical_catalogs_have_no_changes():
+    catalog = bos.create_sample_catalog()
+    assert bos.diff_catalogs(catalog, copy.deepcopy(catalog)).empty
+
+def build_args(monkeypatch, *options):
+    monkeypatch.setattr(sys, "argv", ["build", *options])
+    return bos.parse_args()
+
+def test_plain_rebuild_does_not_read_previous_output(tmp_path, monkeypatch):
+    output = tmp_path / "bos.xlsx"
+    output.write_bytes(b"")
+    monkeypatch.setattr(bos, "load_catalog", lambda *args: pytest.fail("previous output was read"))
+    
+    args = build_args(monkeypatch, "--output", str(output))
+    assert bos.diff_previous_build(args, bos.create_sample_catalog()) == (None, None)
+
+def test_change_log_json_without_previous_build_lists_every_record(tmp_path, monkeypatch):
+    catalog = bos.create_sample_catalog()
+    args = build_args(monkeypatch, "--output", str(tmp_path / "bos.xlsx"),
+                      "--change-log-json", str(tmp_path / "changes.json"))
+    assert bos.diff_previous_build(args, catalog) == (None, None)
+    
+    document = json.loads((tmp_path / "changes.json").read_text())
+    assert document["previous"] is None
+    assert {change["change_type"] for change in document["changes"]} == {"added"}
+    assert len(document["changes"]) == sum(len(catalog[table]) - 1 for table in bos.CATALOG_TABLES)
@@ -0,0 +1,62 @@
+"""evaluate_slis on small event stores against counts taken directly from the generated events"""
+import contextlib
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+import build_bos_excel as bos
+
+SLI_HEADER = ["service_id", "sliName", "sliType", "goodEventsCriteria_Dev", "totalEventsCriteria_Dev", "dataSourceDetails"]
+SLIS = [
+    ("ok-rate", "status = 'OK'", "1 = 1"),
+    ("fast-rate", "latency_ms < 500", "status != 'TIMEOUT'"),
+]
+
+def event_store(store_dir, n_databases, rng):
+    """One events table per db<N>.db, plus the catalog SLIs reading it and their expected counts"""
+    rows, expected = [], {}
+    for d in range(n_databases):
+        status = rng.choice(["OK", "ERROR", "TIMEOUT"], size=100 + d, p=[0.8, 0.15, 0.05])
+        latency = rng.integers(50, 1000, size=status.size)
+        with contextlib.closing(sqlite3.connect(store_dir / f"db{d}.db")) as connection:
+            connection.execute("CREATE TABLE events (status TEXT, latency_ms INTEGER)")
+            connection.executemany("INSERT INTO events VALUES (?, ?)", zip(status.tolist(), latency.tolist()))
+            connection.commit()
+    
+        source = json.dumps({"database": f"db{d}", "table": "events"})
+        for name, good, total in SLIS:
+            rows.append([f"SVC{d:03d}", name, "ratioMetric", good, total, source])
+        expected[(f"SVC{d:03d}", "ok-rate")] = ((status == "OK").sum(), status.size)
+        expected[(f"SVC{d:03d}", "fast-rate")] = ((latency < 500) & (status != "TIMEOUT")).sum(), (status != "TIMEOUT").sum()
+    catalog = {"SLI_Definitions": [SLI_HEADER] + rows, "SLO_Configurations": [["service_id", "timeWindow"]]}
+    return catalog, expected
+
+@pytest.mark.parametrize("n_databases", [2, bos.SQLITE_MAX_ATTACHED + 2])
+@pytest.mark.parametrize("workers", [1, 3])
+def test_counts_match_events(tmp_path, n_databases, workers):
+    catalog, expected = event_store(tmp_path, n_databases, np.random.default_rng(n_databases * 10 + workers))
+    
+    with contextlib.closing(bos.EventStorePool(str(tmp_path), workers)) as pool:
+        results = bos.evaluate_slis(catalog, pool, workers)
+    
+    counts = {(record.service_id, record.sliName): (record.good_events, record.total_events)
+              for record in results.itertuples(index=False)}
+    assert counts == expected
+    assert list(results["source"].unique()) == [f"db{d}.events" for d in range(n_databases)]
+
+def test_unattachable_databases_are_reported(tmp_path, capsys):
+    catalog, expected = event_store(tmp_path, 1, np.random.default_rng(0))
+    (tmp_path / "broken.db").write_bytes(b"not a database\n" * 100)
+    for database in ["broken", "missing"]:
+        source = json.dumps({"database": database, "table": "events"})
+        catalog["SLI_Definitions"].append([f"SVC-{database}", "ok-rate", "ratioMetric", "1 = 1", "1 = 1", source])
+    
+    with contextlib.closing(bos.EventStorePool(str(tmp_path), 2)) as pool:
+        results = bos.evaluate_slis(catalog, pool, 2)
+    
+    assert set(zip(results["service_id"], results["sliName"])) == set(expected)
+    out = capsys.readouterr().out
+    assert "Skipping broken.events: file is not a database" in out
+    assert "Skipping missing.events: no missing.db in" in out
@@ -0,0 +1,148 @@
+"""FormulaEvaluator on small workbooks against lookups done directly in Python"""
+import re
+import zipfile
+
+import numpy as np
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils import column_index_from_string
+
+import build_bos_excel as bos
+
+def text_0_0h(value):
+    """TEXT(value, "0.0#"): two decimals, the second only when it is not zero"""
+    text = f"{value:.2f}"
+    return text[:-1] if text.endswith("0") else text
+
+def lookup_workbook(rng, n_rows=40, n_lookups=60):
+    """Data sheet of ids, names and rates plus a Lookup sheet of INDEX/MATCH formulas over it"""
+    wb = Workbook()
+    data = wb.active
+    data.title = "Data"
+    data.append(["id", "name", "rate"])
+    ids = [f"Svc{int(i):02d}" for i in rng.integers(0, 30, n_rows)]
+    for i, sid in enumerate(ids):
+        data.append([sid, f"name {i}", round(float(rng.uniform(80, 100)), 2)])
+    
+    lookup = wb.create_sheet("Lookup")
+    keys = [str(rng.choice([f"svc{int(rng.integers(0, 40)):02d}", f"SVC{int(rng.integers(0, 40)):02d}", ""]))
+            for _ in range(n_lookups)]
+    for row, key in enumerate(keys, 1):
+        lookup.append([
+            key,
+            f'=IF(A{row}="","",IFERROR(INDEX(Data!B:B,MATCH(A{row},Data!A:A,0)),"missing"))',
+            f'=IFERROR(TEXT(INDEX(Data!$C:$C,MATCH(A{row},Data!$A$1:$A$1000,0)),"0.0#")&"%","n/a")',
+            f'=B{row}&"|"&C{row}',
+            f'=A{row}=B{row}',
+        ])
+    return wb, ids, keys
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lookups_match_python(seed):
+    rng = np.random.default_rng(seed)
+    wb, ids, keys = lookup_workbook(rng)
+    data_rows = list(wb["Data"].iter_rows(min_row=2, values_only=True))
+    cached = bos.evaluate_workbook_formulas(wb)["Lookup"]
+    
+    for row, key in enumerate(keys, 1):
+        # MATCH(..., 0) finds the first id equal to the key, ignoring case
+        found = next((r for r in data_rows if r[0].casefold() == key.casefold()), None) if key else None
+        name = "" if not key else found[1] if found else "missing"
+        rate = f"{text_0_0h(found[2])}%" if found else "n/a"
+        assert cached[f"B{row}"] == name
+        assert cached[f"C{row}"] == rate
+        assert cached[f"D{row}"] == f"{name}|{rate}"
+        assert cached[f"E{row}"] is (key.casefold() == name.casefold())
+
+def test_errors_and_unsupported_formulas():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet"
+    ws["A1"] = "=A1"
+    ws["A2"] = "=NA()"
+    ws["A3"] = "=IFERROR(NA(),\"fallback\")"
+    ws["A4"] = "=SUM(B1:B2)"
+    ws["A5"] = "=B9"
+    ws["A6"] = "=INDEX(B:B,0)"
+    cached = bos.evaluate_workbook_formulas(wb)["Sheet"]
+    
+    assert str(cached["A1"]) == "#REF!"
+    assert str(cached["A2"]) == "#N/A"
+    assert cached["A3"] == "fallback"
+    assert "A4" not in cached
+    assert cached["A5"] == 0
+    assert str(cached["A6"]) == "#REF!"
+    with pytest.raises(bos.UnsupportedFormula):
+        bos.FormulaEvaluator(wb).cell("Sheet", 4, 1)
+
+@pytest.mark.parametrize("service_index", [1, 2])
+def test_built_dashboard_matches_catalog(service_index):
+    catalog = bos.create_sample_catalog()
+    wb = bos.create_bos_workbook(catalog=catalog)
+    services = catalog["Services"]
+    service = services[service_index]
+    wb["Dashboard"]["B3"] = service[services[0].index("displayName")]
+    cached = bos.evaluate_workbook_formulas(wb)["Dashboard"]
+    assert cached["A1"] == service[0]
+    
+    # Every IFERROR(INDEX(<table>!X:X, MATCH(A1, <table>!A:A, 0)), fallback) is the catalog field of that service
+    pattern = re.compile(r'=IFERROR\(INDEX\((\w+)!([A-Z]+):\2,MATCH\(A1,\1!A:A,0\)\), "([^"]*)"\)')
+    checked = 0
+    for coordinate, value in cached.items():
+        match = pattern.fullmatch(wb["Dashboard"][coordinate].value)
+        if match is None or match.group(1) not in catalog:
+            continue
+        table, column, fallback = match.groups()
+        rows = [row for row in catalog[table][1:] if row[0] == service[0]]
+        expected = rows[0][column_index_from_string(column) - 1] if rows else fallback
+        assert value == (0 if expected is None else expected), coordinate
+        checked += 1
+    assert checked >= 15
+
+@pytest.mark.parametrize("empty_value", ["<v />", "<v/>", "<v></v>", ""])
+def test_cached_values_fill_either_writer_form(empty_value):
+    # ElementTree writes <v />, lxml writes <v></v>
+    wb = Workbook()
+    ws = wb.active
+    part = f'<sheetData><row r="1"><c r="A1" s="3"><f>B1*2</f>{empty_value}</c><c r="A2"><f>B2</f><v>7</v></c></row></sheetData>'
+    parts = {"xl/worksheets/sheet1.xml": part.encode("utf-8")}
+    bos.write_cached_values(parts, wb, {ws.title: {"A1": 4, "A2": 9}})
+    
+    xml = parts["xl/worksheets/sheet1.xml"].decode("utf-8")
+    assert '<c r="A1" s="3"><f>B1*2</f><v>4</v></c>' in xml
+    assert '<c r="A2"><f>B2</f><v>7</v></c>' in xml
+
+def test_saved_workbook_reads_back_without_recalculation(tmp_path):
+    catalog = bos.create_sample_catalog()
+    wb = bos.create_bos_workbook(catalog=catalog)
+    expected = bos.evaluate_workbook_formulas(wb)
+    path = tmp_path / "bos.xlsx"
+    bos.save_workbook(wb, str(path))
+    
+    # Text cells are interned into the shared strings table, none keep inline text
+    with zipfile.ZipFile(path) as archive:
+        assert bos.SHARED_STRINGS_PART in archive.namelist()
+        for name in archive.namelist():
+            if bos.WORKSHEET_PART.match(name):
+                assert b"<is>" not in archive.read(name), name
+    
+    values = load_workbook(path, data_only=True)
+    services = catalog["Services"]
+    assert values["Services"]["B1"].value == "serviceName"
+    assert [cell.value for cell in values["Services"][2]][:len(services[1])] == services[1]
+    
+    # Every formula on the Dashboard and Service_Data_Model reads back as its evaluated value
+    for title in ["Dashboard", "Service_Data_Model"]:
+        filled = 0
+        for row in load_workbook(path)[title].iter_rows():
+            for cell in row:
+                if not (isinstance(cell.value, str) and cell.value.startswith("=")):
+                    continue
+                value = expected[title][cell.coordinate]
+                if isinstance(value, bos.FormulaError):
+                    value = str(value)
+                # An empty text result is stored as an empty <v>, which readers load as a blank cell
+                assert values[title][cell.coordinate].value == (None if value == "" else value), cell.coordinate
+                filled += 1
+        assert filled >= 15
+    assert values["Dashboard"]["A1"].value == services[1][0]
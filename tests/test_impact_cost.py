@@ -0,0 +1,86 @@
+"""parse_impact_rates and compute_impact_cost on hand-computed failures, incidents and rates"""
+import math
+
+import pandas as pd
+import pytest
+
+import build_bos_excel as bos
+
+MIDNIGHT = 1_699_920_000  # 2023-11-14 00:00 UTC
+IMPACT_HEADER = ["service_id", "stakeholderCount", "financialImpact"]
+
+@pytest.fixture(autouse=True)
+def fresh_memo(monkeypatch):
+    monkeypatch.setattr(bos, "_impact_rates", {})
+
+def test_rates_parse_counts_periods_and_dollars():
+    rates = bos.parse_impact_rates([IMPACT_HEADER,
+        ["SVC001", "1,200 weekly", ""],
+        ["SVC001", "12 hourly", "$2.5k per call"],
+        ["SVC001", "", "$9 per retry"],
+        ["SVC002", "50 processors", "$1.2M average per outage hour"],
+        ["SVC003", "30 monthly", "not quantified"],
+    ]).set_index("service_id")
+    
+    assert rates.loc["SVC001", "daily_stakeholders"] == pytest.approx(1200 / 7 + 12 * 24)
+    assert (rates.loc["SVC001", "dollars_per_unit"], rates.loc["SVC001", "dollar_unit"]) == (2500.0, "call")
+    assert math.isnan(rates.loc["SVC002", "daily_stakeholders"])
+    assert (rates.loc["SVC002", "dollars_per_unit"], rates.loc["SVC002", "dollar_unit"]) == (1_200_000.0, "outage hour")
+    assert rates.loc["SVC003", "daily_stakeholders"] == 1.0
+    assert math.isnan(rates.loc["SVC003", "dollars_per_unit"])
+
+def test_memo_keeps_only_the_last_parse():
+    rows = bos.create_sample_catalog()["Impact_Assessments"]
+    first = bos.parse_impact_rates(rows)
+    assert bos.parse_impact_rates([list(row) for row in rows]) is first
+    
+    edited = [list(row) for row in rows]
+    edited[1][3] = "900 daily"
+    second = bos.parse_impact_rates(edited)
+    assert second is not first
+    assert second.set_index("service_id").loc["SVC001", "daily_stakeholders"] == 900.0
+    assert len(bos._impact_rates) == 1
+    assert bos.parse_impact_rates(rows) is not first
+
+def test_costs_per_service_product_line_and_day(tmp_path):
+    rows = []
+    for hour in range(48):
+        rows.append(["SVC001", MIDNIGHT + hour * 3600, 990, 1000])
+        rows.append(["SVC002", MIDNIGHT + hour * 3600, 500 if hour < 24 else 495, 500])
+        rows.append(["SVC999", MIDNIGHT + hour * 3600, 0, 1000])
+    history = pd.DataFrame(rows, columns=["service_id", "timestamp", "good_events", "total_events"])
+    incidents = tmp_path / "incidents.csv"
+    incidents.write_text(
+        "# one open incident on day two, one resolved on day one, one outside the catalog\n"
+        "incident_id,severity,status,started,summary,service_id\n"
+        "INC1,Sev1,Open,3h ago,Credit bureau timeouts,SVC002\n"
+        "INC2,Sev2,Resolved,2023-11-14T05:00:00Z,Upload retries,SVC001\n"
+        "INC3,Sev1,Open,1h ago,Elsewhere,SVC999\n"
+    )
+    
+    report = bos.compute_impact_cost(bos.create_sample_catalog(), history, str(incidents))
+    assert list(report.columns) == bos.IMPACT_COST_COLUMNS
+    assert list(report["level"]) == ["service"] * 4 + ["product line"] * 2 + ["total"] * 2
+    services = report[report["level"] == "service"].set_index(["service_id", "period"])
+    
+    day_one, day_two = ("SVC001", "2023-11-14"), ("SVC001", "2023-11-15")
+    for key in [day_one, day_two]:
+        row = services.loc[key]
+        assert (row["failed_events"], row["total_events"], row["customers_affected_sli"]) == (240, 24000, 8.5)
+        assert row["dollars_at_risk"] == 8.5 * 380000
+    assert services.loc[day_one, "incidents"] == 1 and math.isnan(services.loc[day_one, "incident_hours"])
+    assert services.loc[day_two, "incidents"] == 0
+    
+    assert services.loc[("SVC002", "2023-11-14"), "dollars_at_risk"] == 0
+    open_incident = services.loc[("SVC002", "2023-11-15")]
+    assert (open_incident["incidents"], open_incident["incident_hours"]) == (1, 3.0)
+    assert open_incident["customers_affected_sli"] == 20.0
+    assert open_incident["customers_affected_incidents"] == 2000 * 3 / 24
+    assert open_incident["dollars_at_risk"] == 250 * 50000
+    
+    product_lines = report[report["level"] == "product line"].set_index("period")
+    assert list(product_lines["businessUnit"]) == ["Home Lending", "Home Lending"]
+    assert product_lines.loc["2023-11-15", "dollars_at_risk"] == 8.5 * 380000 + 250 * 50000
+    totals = report[report["level"] == "total"].set_index("period")
+    assert totals.loc["2023-11-14", "failed_events"] == 240
+    assert totals.loc["2023-11-15", "incidents"] == 1
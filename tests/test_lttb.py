@@ -0,0 +1,40 @@
+"""downsample_lttb against a point-by-point Largest-Triangle-Three-Buckets reference"""
+import numpy as np
+import pytest
+
+import build_bos_excel as bos
+
+def naive_lttb(x, y, n_out):
+    """Indices LTTB keeps, with the same bucket edges, computed one point at a time"""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return list(range(n))
+    edges = [int(edge) for edge in np.linspace(1, n - 1, n_out - 1)]
+    buckets = [range(edges[i], edges[i + 1]) for i in range(n_out - 2)] + [range(n - 1, n)]
+    picked = [0]
+    for i in range(n_out - 2):
+        following = buckets[i + 1]
+        avg_x = sum(x[j] for j in following) / len(following)
+        avg_y = sum(y[j] for j in following) / len(following)
+        a = picked[-1]
+        best, best_area = None, -1.0
+        for j in buckets[i]:
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        picked.append(best)
+    return picked + [n - 1]
+
+@pytest.mark.parametrize("n", [3, 4, 5, 10, 100, 1000])
+@pytest.mark.parametrize("n_out", [2, 3, 4, bos.TREND_POINTS, 999, 1000, 1001])
+def test_lttb_matches_reference(n, n_out):
+    rng = np.random.default_rng(n * 7919 + n_out)
+    # Whole-number points keep every bucket sum exact, so both versions break ties the same way
+    x = np.cumsum(rng.integers(1, 60, n)).astype(float)
+    y = rng.integers(0, 1000, n).astype(float)
+    
+    out_x, out_y = bos.downsample_lttb(x, y, n_out)
+    picked = naive_lttb(x, y, n_out)
+    np.testing.assert_array_equal(out_x, x[picked])
+    np.testing.assert_array_equal(out_y, y[picked])
+    assert len(out_x) == (n_out if 3 <= n_out < n else n)
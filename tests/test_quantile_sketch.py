@@ -0,0 +1,62 @@
+"""QuantileSketch against exact quantiles and counts of the raw samples"""
+import numpy as np
+import pytest
+
+import build_bos_excel as bos
+
+ACCURACY = bos.SKETCH_RELATIVE_ACCURACY + 1e-9
+QUANTILES = [0, 0.01, 0.25, 0.5, 0.9, 0.95, 0.99, 1]
+
+def exact_quantile(samples, q):
+    """The sample the sketch rank q * (count - 1) falls on"""
+    return np.sort(samples)[int(q * (len(samples) - 1))]
+
+def samples_for(seed, size=5000):
+    rng = np.random.default_rng(seed)
+    return np.concatenate([rng.lognormal(5, 1.5, size), np.zeros(size // 100)])
+
+@pytest.mark.parametrize("seed", range(5))
+def test_quantiles_within_relative_accuracy(seed):
+    samples = samples_for(seed)
+    sketch = bos.QuantileSketch().add(samples)
+    for q in QUANTILES:
+        assert sketch.quantile(q) == pytest.approx(exact_quantile(samples, q), rel=ACCURACY, abs=0)
+
+def test_nan_ignored_and_negatives_count_as_zero():
+    sketch = bos.QuantileSketch().add([np.nan, -5, 0, 10, np.nan])
+    assert sketch.count == 3
+    assert sketch.zero_count == 2
+    assert sketch.quantile(0) == 0
+    assert bos.QuantileSketch().quantile(0.5) is None
+
+@pytest.mark.parametrize("seed", range(3))
+def test_merge_equals_single_sketch(seed):
+    samples = samples_for(seed)
+    whole = bos.QuantileSketch().add(samples)
+    merged = bos.QuantileSketch()
+    for chunk in np.array_split(samples, 7):
+        merged.merge(bos.QuantileSketch().add(chunk))
+    assert merged.bins == whole.bins
+    assert (merged.zero_count, merged.count) == (whole.zero_count, whole.count)
+    assert [merged.quantile(q) for q in QUANTILES] == [whole.quantile(q) for q in QUANTILES]
+
+def test_collapsed_sketch_keeps_upper_quantiles():
+    samples = np.random.default_rng(0).lognormal(5, 0.5, 20000)
+    sketch = bos.QuantileSketch(max_bins=64)
+    for chunk in np.array_split(samples, 10):
+        sketch.add(chunk)
+    assert len(sketch.bins) <= 64
+    assert sketch.count == len(samples)
+    for q in [0.9, 0.95, 0.99, 1]:
+        assert sketch.quantile(q) == pytest.approx(exact_quantile(samples, q), rel=ACCURACY, abs=0)
+
+@pytest.mark.parametrize("operator", sorted(bos.THRESHOLD_OPERATORS))
+@pytest.mark.parametrize("share", [0.1, 0.5, 0.99])
+def test_count_meeting_within_band(operator, share):
+    samples = samples_for(1)
+    threshold = exact_quantile(samples, share) * 1.003
+    sketch = bos.QuantileSketch().add(samples)
+    exact = int(bos.THRESHOLD_OPERATORS[operator](samples, threshold).sum())
+    # Only samples within the relative accuracy of the threshold can land in a bin on its other side
+    band = int((np.abs(samples - threshold) <= ACCURACY * samples).sum())
+    assert abs(sketch.count_meeting(operator, threshold) - exact) <= band
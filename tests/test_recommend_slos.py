@@ -0,0 +1,80 @@
+"""recommend_slos against trailing-window success rates summed one timestamp at a time"""
+import math
+
+import numpy as np
+import pandas as pd
+
+import build_bos_excel as bos
+
+HOUR = 3600
+WINDOWS = ["6h", "1d", "10d"]
+
+def metric_history(rng, hours=120):
+    """Hourly events for two catalog services and one without an SLO; SVC002 skips some hours and has idle ones"""
+    rows = []
+    for service_id, failure_rate in [("SVC001", 0.004), ("SVC002", 0.03), ("SVC999", 0.5)]:
+        for hour in range(hours):
+            if service_id == "SVC002" and hour % 17 == 5:
+                continue
+            total = 0 if service_id == "SVC002" and hour % 23 == 0 else int(rng.integers(200, 2000))
+            bad = int(rng.binomial(total, failure_rate)) if total else 0
+            rows.append([service_id, 1_700_000_000 + hour * HOUR, total - bad, total])
+    history = pd.DataFrame(rows, columns=["service_id", "timestamp", "good_events", "total_events"])
+    history["success_rate"] = history["good_events"] / history["total_events"] * 100
+    return history
+
+def naive_rates(history, service_id, window, hours):
+    """Success rate of every complete trailing window, or of the whole history when it is shorter than the window"""
+    events = history[history["service_id"] == service_id]
+    good = dict(zip(events["timestamp"], events["good_events"]))
+    total = dict(zip(events["timestamp"], events["total_events"]))
+    stamps = [1_700_000_000 + hour * HOUR for hour in range(hours)]
+    points = bos.parse_time_window(window) // HOUR
+    ends = range(points - 1, hours) if points <= hours else [hours - 1]
+    rates = []
+    for end in ends:
+        span = stamps[max(0, end - points + 1):end + 1]
+        window_good = float(sum(good.get(stamp, 0) for stamp in span))
+        window_total = float(sum(total.get(stamp, 0) for stamp in span))
+        if window_total > 0:
+            rates.append(window_good / window_total * 100)
+    return rates
+
+def test_recommendations_match_reference():
+    history = metric_history(np.random.default_rng(36))
+    catalog = bos.create_sample_catalog()
+    catalog["SLO_Configurations"][2][3] = "1d"  # SVC002 is judged on a window that is analyzed, SVC001 (7d) on the longest
+    
+    result = bos.recommend_slos(history, catalog, WINDOWS)
+    assert list(result["service_id"]) == ["SVC001", "SVC002"]
+    
+    for record, basis in zip(result.to_dict("records"), ["10d", "1d"]):
+        percentiles = {}
+        for window in WINDOWS:
+            rates = naive_rates(history, record["service_id"], window, 120)
+            for q in bos.RECOMMEND_PERCENTILES:
+                percentiles[window, q] = float(np.percentile(rates, q))
+                assert record[f"{window}_p{q}"] == round(percentiles[window, q], 3)
+        assert record["basis"] == f"p{bos.RECOMMEND_PERCENTILE} of rolling {basis} success rate"
+        
+        floor_rate = percentiles[basis, bos.RECOMMEND_PERCENTILE]
+        recommended = max([target for target in bos.SLO_TARGET_LADDER if target <= floor_rate],
+                          default=math.floor(floor_rate))
+        budget = 100 - recommended
+        assert record["recommended_sloTarget"] == round(recommended, 2)
+        assert record["recommended_alertingThreshold"] == round(recommended - 0.4 * budget, 3)
+        assert record["recommended_pageThreshold"] == round(recommended - budget, 3)
+        median_rate = percentiles[basis, 50]
+        assert record["budget_used_pct"] == round((100 - median_rate) / (100 - 99.5) * 100, 1)
+        assert record["recommended_budget_used_pct"] == round((100 - median_rate) / budget * 100, 1)
+        assert (record["sloTarget"], record["alertingThreshold"], record["pageThreshold"]) == (99.5, 99.3, 99.0)
+
+def test_services_below_the_ladder_round_down():
+    rng = np.random.default_rng(7)
+    history = metric_history(rng, hours=48)
+    history.loc[history["service_id"] == "SVC001", "good_events"] //= 2
+    
+    record = bos.recommend_slos(history, bos.create_sample_catalog(), ["6h"]).iloc[0]
+    floor_rate = float(np.percentile(naive_rates(history, "SVC001", "6h", 48), bos.RECOMMEND_PERCENTILE))
+    assert floor_rate < bos.SLO_TARGET_LADDER[0]
+    assert record["recommended_sloTarget"] == math.floor(floor_rate)
@@ -0,0 +1,83 @@
+"""DashboardService over a real socket: JSON routes, ETags and conditional requests"""
+import asyncio
+import io
+import json
+
+from openpyxl import load_workbook
+
+import build_bos_excel as bos
+
+def fetch(service, requests):
+    """Send (method, path, headers) requests one connection each; returns (status, headers, body) per request"""
+    async def run():
+        server = await asyncio.start_server(service.handle_connection, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        responses = []
+        async with server:
+            for method, path, headers in requests:
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                lines = [f"{method} {path} HTTP/1.1", "Host: localhost", "Connection: close"]
+                lines += [f"{name}: {value}" for name, value in headers.items()]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+                raw = await reader.read()
+                writer.close()
+                head, _, body = raw.partition(b"\r\n\r\n")
+                status_line, *header_lines = head.decode("latin-1").split("\r\n")
+                response_headers = dict(line.split(": ", 1) for line in header_lines)
+                responses.append((int(status_line.split()[1]), response_headers, body))
+        return responses
+    return asyncio.run(run())
+
+def sample_service(cache_size=16):
+    return bos.DashboardService(bos.create_sample_catalog(), None, cache_size)
+
+def test_service_json_and_conditional_requests():
+    service = sample_service()
+    (status, headers, body), = fetch(service, [("GET", "/services/SVC002", {})])
+    assert status == 200
+    assert headers["Content-Type"] == bos.JSON_CONTENT_TYPE
+    document = json.loads(body)
+    assert document["service_id"] == "SVC002"
+    assert document["displayName"] == "Credit Check Service"
+    assert document["serviceContext"]["tierLevel"] == 2
+    
+    etag = headers["ETag"]
+    responses = fetch(service, [
+        ("GET", "/services/SVC002", {"If-None-Match": etag}),
+        ("GET", "/services/SVC002", {"If-None-Match": '"stale", ' + etag}),
+        ("GET", "/services/SVC002", {"If-None-Match": '"stale"'}),
+        ("HEAD", "/services/SVC002", {}),
+        ("GET", "/services/SVC001", {"If-None-Match": etag}),
+    ])
+    assert [(status, len(body)) for status, _, body in responses[:2]] == [(304, 0), (304, 0)]
+    assert responses[2][0] == 200 and json.loads(responses[2][2]) == document
+    assert responses[3][0] == 200 and responses[3][2] == b""
+    assert int(responses[3][1]["Content-Length"]) == len(body)
+    assert responses[4][0] == 200 and responses[4][1]["ETag"] != etag
+
+def test_unknown_paths_and_methods():
+    responses = fetch(sample_service(), [
+        ("GET", "/services/SVC999", {}),
+        ("GET", "/product-lines/Nowhere.xlsx", {}),
+        ("POST", "/services", {}),
+    ])
+    assert [status for status, _, _ in responses] == [404, 404, 405]
+    assert responses[2][1]["Allow"] == "GET, HEAD"
+
+def test_service_list_and_workbook_etags_are_stable():
+    service = sample_service()
+    responses = fetch(service, [("GET", "/services", {}), ("GET", "/services/SVC001.xlsx", {})])
+    assert [entry["service_id"] for entry in json.loads(responses[0][2])] == ["SVC001", "SVC002"]
+    
+    status, headers, body = responses[1]
+    assert status == 200
+    assert headers["Content-Disposition"] == 'attachment; filename="BOS_SVC001.xlsx"'
+    services = load_workbook(io.BytesIO(body))["Services"]
+    assert [row[0] for row in services.iter_rows(min_row=2, values_only=True)] == ["SVC001"]
+    
+    # A cache too small to keep the workbook regenerates it with the same bytes and ETag
+    small = sample_service(cache_size=1)
+    first, _, second = fetch(small, [("GET", "/services/SVC001.xlsx", {}), ("GET", "/services", {}),
+                                     ("GET", "/services/SVC001.xlsx", {})])
+    assert first[1]["ETag"] == second[1]["ETag"]
+    assert first[2] == second[2]
@@ -0,0 +1,52 @@
+"""save_workbook's shared strings table read back by openpyxl, for every compression level"""
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+import build_bos_excel as bos
+
+VALUES = ["Home Lending", "  padded  ", "<a & b>", "quote \"q\" 'q'", "✓ done", "Not Defined"]
+
+def sample_workbook():
+    """Two sheets repeating a few strings, with numbers and blanks between them"""
+    wb = Workbook()
+    first = wb.active
+    first.title = "First"
+    second = wb.create_sheet("Second")
+    for row in range(1, 41):
+        first.cell(row=row, column=1, value=VALUES[row % len(VALUES)])
+        first.cell(row=row, column=2, value=row * 1.5)
+        second.cell(row=row, column=3, value=VALUES[(row * 7) % len(VALUES)])
+    return wb
+
+@pytest.mark.parametrize("compression_level", [0, 1, 9])
+def test_repeated_text_is_stored_once(tmp_path, compression_level):
+    path = tmp_path / "strings.xlsx"
+    report = bos.save_workbook(sample_workbook(), str(path), compression_level=compression_level)
+    
+    with zipfile.ZipFile(path) as archive:
+        shared = archive.read(bos.SHARED_STRINGS_PART).decode("utf-8")
+        assert bos.SHARED_STRINGS_CONTENT_TYPE in archive.read("[Content_Types].xml").decode("utf-8")
+        assert bos.SHARED_STRINGS_REL_TYPE in archive.read("xl/_rels/workbook.xml.rels").decode("utf-8")
+        for info in archive.infolist():
+            assert info.compress_type == (zipfile.ZIP_STORED if compression_level == 0 else zipfile.ZIP_DEFLATED)
+            if bos.WORKSHEET_PART.match(info.filename):
+                assert b"<is>" not in archive.read(info.filename)
+    assert 'count="80" uniqueCount="6"' in shared
+    assert {name for name, _, _ in report} >= {bos.SHARED_STRINGS_PART, "xl/worksheets/sheet1.xml"}
+    
+    wb = load_workbook(path)
+    assert [cell.value for cell in wb["First"]["A"]] == [VALUES[row % len(VALUES)] for row in range(1, 41)]
+    assert [cell.value for cell in wb["First"]["B"]] == [row * 1.5 for row in range(1, 41)]
+    assert [cell.value for cell in wb["Second"]["C"]] == [VALUES[(row * 7) % len(VALUES)] for row in range(1, 41)]
+
+def test_workbook_without_text_gets_no_table(tmp_path):
+    wb = Workbook()
+    wb.active["A1"] = 1
+    path = tmp_path / "numbers.xlsx"
+    bos.save_workbook(wb, str(path))
+    
+    with zipfile.ZipFile(path) as archive:
+        assert bos.SHARED_STRINGS_PART not in archive.namelist()
+    assert load_workbook(path).active["A1"].value == 1
@@ -0,0 +1,61 @@
+"""build_site rebuilds: only pages whose inputs changed are written, pages of removed services are deleted"""
+import json
+import os
+
+import pandas as pd
+
+import build_bos_excel as bos
+
+PAGES = ["index.html", "l4/home-lending.html", "l3/home-lending/unassigned.html",
+         "services/svc001.html", "services/svc002.html"]
+
+def metric_history():
+    rows = [[service_id, 1_700_000_000 + hour * 3600, 990 + hour % 10, 1000]
+            for service_id in ["SVC001", "SVC002"] for hour in range(72)]
+    history = pd.DataFrame(rows, columns=["service_id", "timestamp", "good_events", "total_events"])
+    history["success_rate"] = history["good_events"] / history["total_events"] * 100
+    return history
+
+def read(site_dir, path):
+    with open(os.path.join(site_dir, path), encoding="utf-8") as f:
+        return f.read()
+
+def test_rebuilds_write_only_changed_pages(tmp_path):
+    site_dir = str(tmp_path / "site")
+    catalog, history = bos.create_sample_catalog(), metric_history()
+    assert bos.build_site(catalog, history, site_dir, workers=1) == (len(PAGES), 0, 0)
+    
+    with open(os.path.join(site_dir, bos.SITE_MANIFEST), encoding="utf-8") as f:
+        assert sorted(json.load(f)) == sorted(PAGES)
+    assert os.path.exists(os.path.join(site_dir, bos.SITE_ASSET_DIR, bos.SITE_STYLESHEET_NAME))
+    home = read(site_dir, "index.html")
+    assert 'href="l4/home-lending.html"' in home and "PRODUCT LINES" in home
+    l3 = read(site_dir, "l3/home-lending/unassigned.html")
+    assert 'href="../../services/svc001.html"' in l3 and 'href="../../services/svc002.html"' in l3
+    assert "Credit Check Service" in read(site_dir, "services/svc002.html")
+    
+    # An identical rebuild writes nothing; a page deleted on disk is written again
+    stamps = {path: os.stat(os.path.join(site_dir, path)).st_mtime_ns for path in PAGES}
+    assert bos.build_site(catalog, history, site_dir, workers=1) == (0, len(PAGES), 0)
+    assert {path: os.stat(os.path.join(site_dir, path)).st_mtime_ns for path in PAGES} == stamps
+    os.remove(os.path.join(site_dir, "services/svc001.html"))
+    assert bos.build_site(catalog, history, site_dir, workers=1) == (1, len(PAGES) - 1, 0)
+    
+    # A renamed service changes its own page and the product page listing it, not the counts above them
+    catalog["Services"][2][2] = "Credit Bureau Lookup"
+    assert bos.build_site(catalog, history, site_dir, workers=1) == (2, len(PAGES) - 2, 0)
+    assert "Credit Bureau Lookup" in read(site_dir, "l3/home-lending/unassigned.html")
+    
+    # A removed service loses its page and moves the counts on every index page
+    catalog["Services"] = catalog["Services"][:2]
+    assert bos.build_site(catalog, history, site_dir, workers=1) == (3, 1, 1)
+    assert not os.path.exists(os.path.join(site_dir, "services/svc002.html"))
+    assert "svc002" not in read(site_dir, "l3/home-lending/unassigned.html")
+
+def test_template_or_version_change_rewrites_every_page(tmp_path, monkeypatch):
+    site_dir = str(tmp_path / "site")
+    catalog, history = bos.create_sample_catalog(), metric_history()
+    bos.build_site(catalog, history, site_dir, workers=1)
+    
+    monkeypatch.setattr(bos, "SITE_TEMPLATE_DIGEST", bos.SITE_TEMPLATE_DIGEST + "next")
+    assert bos.build_site(catalog, history, site_dir, workers=1) == (len(PAGES), 0, 0)
@@ -0,0 +1,89 @@
+"""watch_sources driven by a scripted clock: bad edits are reported and the watcher keeps the last good catalog"""
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+import build_bos_excel as bos
+
+def watch_args(tmp_path, monkeypatch):
+    catalog_dir = tmp_path / "catalog"
+    bos.write_catalog_csvs(bos.create_sample_catalog(), str(catalog_dir))
+    monkeypatch.setattr(sys, "argv", ["build", "--watch", "--catalog", str(catalog_dir),
+                                      "--output", str(tmp_path / "bos.xlsx"), "--debounce", "0"])
+    return bos.parse_args()
+
+def edit_services(path, stamp, **columns):
+    """Rewrite Services.csv with renamed or replaced columns and a distinct modification time"""
+    frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+    for column, value in columns.items():
+        if isinstance(value, str) and value.startswith("rename:"):
+            frame = frame.rename(columns={column: value[len("rename:"):]})
+        else:
+            frame[column] = value
+    frame.to_csv(path, index=False)
+    os.utime(path, ns=(stamp, stamp))
+
+def run_watch(args, monkeypatch, edits):
+    """Apply one edit per poll, then stop the watcher; debounce sleeps see no further writes"""
+    edits = list(edits)
+    
+    def sleep(seconds):
+        if seconds != bos.WATCH_POLL_INTERVAL:
+            return
+        if not edits:
+            raise KeyboardInterrupt
+        edits.pop(0)()
+    
+    monkeypatch.setattr(bos.time, "sleep", sleep)
+    bos.watch_sources(args)
+
+def test_missing_display_column_keeps_watching(tmp_path, monkeypatch, capsys):
+    args = watch_args(tmp_path, monkeypatch)
+    services = os.path.join(args.catalog, "Services.csv")
+    run_watch(args, monkeypatch, [
+        lambda: edit_services(services, 10**18, displayName="rename:display_name"),
+        lambda: edit_services(services, 2 * 10**18, displayName="Funding"),
+    ])
+    
+    out = capsys.readouterr().out
+    assert "Services.csv has no displayName column" in out
+    assert "Stopped watching" in out
+    rebuilt = pd.read_excel(args.output, sheet_name="Services", dtype=str)
+    assert list(rebuilt["displayName"]) == ["Funding", "Funding"]
+
+def test_failed_rebuild_keeps_last_good_catalog(tmp_path, monkeypatch, capsys):
+    args = watch_args(tmp_path, monkeypatch)
+    services = os.path.join(args.catalog, "Services.csv")
+    build_outputs = bos.build_outputs
+    change_logs = []
+    
+    def flaky_build_outputs(args, catalog, metric_history, change_log=None, pool=None):
+        if change_log is not None:
+            change_logs.append(change_log)
+            if len(change_logs) == 1:
+                raise KeyError("tierLevel")
+        return build_outputs(args, catalog, metric_history, change_log, pool)
+    
+    monkeypatch.setattr(bos, "build_outputs", flaky_build_outputs)
+    run_watch(args, monkeypatch, [
+        lambda: edit_services(services, 10**18, tierLevel="3"),
+        lambda: edit_services(services, 2 * 10**18, businessUnit="Treasury"),
+    ])
+    
+    assert "KeyError: 'tierLevel'. Keeping the last good data" in capsys.readouterr().out
+    # The second rebuild is diffed against the catalog of the last successful build, so it still shows the first edit
+    fields = set(change_logs[1]["field"])
+    assert {"tierLevel", "businessUnit"} <= fields
+    rebuilt = pd.read_excel(args.output, sheet_name="Services", dtype=str)
+    assert list(rebuilt["tierLevel"]) == ["3", "3"]
+
+@pytest.mark.parametrize("table, column", [("Services", "displayName"), ("Impact_Assessments", "impactCategory")])
+def test_catalog_csv_needs_key_and_display_columns(tmp_path, table, column):
+    bos.write_catalog_csvs(bos.create_sample_catalog(), str(tmp_path))
+    path = tmp_path / f"{table}.csv"
+    pd.read_csv(path, dtype=str).drop(columns=[column]).to_csv(path, index=False)
+    
+    with pytest.raises(ValueError, match=f"{table}.csv has no {column} column"):
+        bos.load_catalog(str(tmp_path))